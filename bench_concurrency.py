@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+#bench_concurrency.py
+# Fetch detail pages through scrape's adaptive limiter and report throughput.
+# Point it at standin_server.py to see where the limit settles:
+#
+#   python standin_server.py --cabins 400 --capacity 8 &
+#   RAILEY_SITE_URL=http://localhost:8000 python bench_concurrency.py
+
+import argparse
+import threading
+import time
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Measure detail fetch throughput under the adaptive limiter')
+    parser.add_argument('--cabins', type=int, default=400,
+                       help='number of detail pages to fetch (default: 400)')
+    args = parser.parse_args(argv)
+
+    import scrape
+    from standin_server import cabin_names, url_name
+
+    def fetch_one(name):
+        scrape.fetch(f"{scrape.SITE_URL}/vacation-rentals/{url_name(name)}")
+
+    def report_limit(threads):
+        while any(thread.is_alive() for thread in threads):
+            print(f"  in flight {scrape.limiter.in_flight:3d}, {scrape.limiter.stats()}")
+            time.sleep(1)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=fetch_one, args=(name,)) for name in cabin_names(args.cabins)]
+    for thread in threads:
+        thread.start()
+    threading.Thread(target=report_limit, args=(threads,), daemon=True).start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"{args.cabins} pages in {elapsed:.2f}s ({args.cabins / elapsed:.1f}/s), {scrape.limiter.stats()}")
+
+
+if __name__ == "__main__":
+    main()
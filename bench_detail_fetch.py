@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+#bench_detail_fetch.py
+# Compare full-page and streaming detail fetches: bytes transferred, time per
+# cabin, and whether both extract the same fields. Serve saved pages locally:
+#
+#   python standin_server.py --pages saved-pages/ --cabins 0 &
+#   RAILEY_SITE_URL=http://localhost:8000 python bench_detail_fetch.py almost-heaven-0 all ...
+
+import argparse
+import time
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Compare full-page and streaming cabin detail fetches')
+    parser.add_argument('pages', nargs='*',
+                       help='url names of the detail pages to fetch (default: the first 50 stand-in cabins)')
+    args = parser.parse_args(argv)
+
+    import scrape
+    import detail_parser
+    from standin_server import cabin_names, url_name
+
+    pages = args.pages or [url_name(name) for name in cabin_names(50)]
+    totals = {"full": [0, 0.0], "stream": [0, 0.0]}
+    mismatches = []
+    for page in pages:
+        url = f"{scrape.SITE_URL}/vacation-rentals/{page}"
+
+        start = time.perf_counter()
+        content = scrape.fetch(url).content
+        full = scrape.parse_details_soup(content)
+        totals["full"][0] += len(content)
+        totals["full"][1] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with scrape.fetch_stream(url) as response:
+            streamed = detail_parser.parse_stream(response.iter_content(chunk_size=scrape.CHUNK_SIZE), scrape.BED_LABELS)
+        totals["stream"][0] += streamed.bytes_read
+        totals["stream"][1] += time.perf_counter() - start
+
+        if (full["lodging_text"] != streamed.lodging_text
+                or full["bed_label_counts"] != streamed.bed_label_counts
+                or scrape.match_amenities(full["amenity_items"]) != scrape.match_amenities(streamed.amenity_items)):
+            mismatches.append(page)
+
+    for mode, (transferred, elapsed) in totals.items():
+        print(f"{mode:<7}{transferred / len(pages) / 1024:9.1f} KB/cabin {elapsed / len(pages) * 1000:8.1f} ms/cabin")
+    print(f"{len(pages) - len(mismatches)}/{len(pages)} pages extracted identically")
+    for page in mismatches:
+        print(f"  differs: {page}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+#bench_startup.py
+# Startup-time benchmark for the railey.py subcommands. Each command is run
+# with --help so only its import path and argument parsing are measured.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ["requests", "bs4", "yaml", "scrape"]
+
+# prints which heavy modules a command's import path loads
+PROBE = """
+import sys, importlib, railey
+importlib.import_module(railey.COMMANDS[sys.argv[1]][0])
+print(','.join(m for m in {heavy!r} if m in sys.modules) or '-')
+"""
+
+
+def time_command(args: list[str], runs: int) -> float:
+    """Median wall time in milliseconds of running the given python arguments."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def loaded_modules(command: str) -> str:
+    result = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), command],
+                            cwd=HERE, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else "import failed"
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Measure startup time of each railey.py subcommand')
+    parser.add_argument('--runs', '-n', type=int, default=10,
+                       help='runs per command; the median is reported (default: 10)')
+    args = parser.parse_args(argv)
+
+    import railey
+    baseline = time_command(["-c", "pass"], args.runs)
+    print(f"{'interpreter':<10}{baseline:8.1f} ms")
+    for command in railey.COMMANDS:
+        elapsed = time_command(["railey.py", command, "--help"], args.runs)
+        print(f"{command:<10}{elapsed:8.1f} ms  (+{elapsed - baseline:.1f} ms over interpreter)  loads: {loaded_modules(command)}")
+
+
+if __name__ == "__main__":
+    main()
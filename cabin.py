@@ -134,6 +134,8 @@ class KeyCabin:
         self.price = price
         self.url = url
         self.amenities = amenities
+        # fields not known yet, for records seeded from old reports or fetched only in part
+        self.missing = set()
 
     def __repr__(self):
         return (
@@ -154,6 +156,40 @@ class KeyCabin:
     def get_price(self) -> Optional[float]:
         return self.price
 
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "occupancy": self.occupancy,
+            "beds": self.beds,
+            "up_beds": self.up_beds,
+            "main_beds": self.main_beds,
+            "low_beds": self.low_beds,
+            "gar_beds": self.gar_beds,
+            "baths": self.baths,
+            "url": self.url,
+            "amenities": list(self.amenities),
+            "price": self.price,
+            "missing": sorted(self.missing),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "KeyCabin":
+        key_cabin = cls(
+            name=d.get("name"),
+            occupancy=d.get("occupancy", 0),
+            beds=d.get("beds", 0),
+            up_beds=d.get("up_beds", 0),
+            main_beds=d.get("main_beds", 0),
+            low_beds=d.get("low_beds", 0),
+            gar_beds=d.get("gar_beds", 0),
+            baths=d.get("baths", 0),
+            url=d.get("url", ""),
+            amenities=list(d.get("amenities", [])),
+            price=d.get("price", 0.0),
+        )
+        key_cabin.missing = set(d.get("missing", []))
+        return key_cabin
+
     #score calculations based on a theoretical money people would be willing to spend to have a feature
     def get_score(self) -> int:
         score = 5000 - self.price
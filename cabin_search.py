@@ -2,10 +2,12 @@
 #cabin_search.py
 
 import argparse
-import scrape
+import contextlib
+import dataclasses
+import datetime
 import report_formatter
-from cabin import KeyCabin
-from config import REQUIRED_AMENITIES, MIN_OCCUPANCY, MAX_OCCUPANCY, MIN_BEDS, MAX_BEDS, MIN_BATHS, MAX_BATHS, MIN_UP_BEDS
+from config import REQUIRED_AMENITIES
+from profiles import default_profile, load_profiles, union_windows
 
 
 #create tuples with the start and end dates for each weekend in June, july, and august 2026 adding on the friday before and monday after
@@ -29,6 +31,26 @@ SUMMER_WEEKENDS_2026 = [
 ]
 
 
+# Build (name, bm, bd, by, em, ed, ey) tuples for every Friday-to-Monday weekend
+# whose Friday falls between start and end, named like the list above plus the
+# year ("June 2027 Weekend 2"), since reports and run state are keyed by name
+# and a horizon past a year would otherwise give two weekends the same one
+def weekend_windows(start: datetime.date, end: datetime.date) -> list[tuple]:
+    windows = []
+    friday = start + datetime.timedelta(days=(4 - start.weekday()) % 7)
+    while friday <= end:
+        saturday = friday + datetime.timedelta(days=1)
+        monday = friday + datetime.timedelta(days=3)
+        weekend_number = (saturday.day - 1) // 7 + 1
+        windows.append((
+            f"{saturday.strftime('%B')} {saturday.year} Weekend {weekend_number}",
+            f"{friday.month:02d}", f"{friday.day:02d}", f"{friday.year}",
+            f"{monday.month:02d}", f"{monday.day:02d}", f"{monday.year}",
+        ))
+        friday += datetime.timedelta(days=7)
+    return windows
+
+
 def get_average_price(cabins):
     total_price = 0
     count = 0
@@ -48,28 +70,23 @@ def get_average_price(cabins):
 def prices_for_cabins_on_weekend(weekend):
     #unpack weekend tuple
     name, bm, bd, by, em, ed, ey = weekend
+    import scrape
     print(f"Processing {name}...")
     result = scrape.search(bm, bd, by, em, ed, ey)
     print("Search complete, processing results...")
     cabins = scrape.process_cabin_list(result)
 
-    filtered_cabins = []
+    # Apply filters based on occupancy, beds, baths, amenities and upper beds
+    return [cabin for cabin in cabins if passes_filters(cabin)]
 
-    for cabin in cabins:
-        if MIN_OCCUPANCY <= cabin.occupancy <= MAX_OCCUPANCY and MIN_BEDS <= cabin.beds <= MAX_BEDS and MIN_BATHS <= cabin.baths <= MAX_BATHS:
-            req_amen_names =[amenity.name for amenity in REQUIRED_AMENITIES]
-            if not (set(req_amen_names) <= set(cabin.amenities)):
-                print(f"Missing amenities for {cabin.name}: {set(req_amen_names) - set(cabin.amenities)}")
-                continue
+# one line of --memtrace figures per run
+MEMTRACE_HISTORY = "memtrace.jsonl"
 
-            if cabin.up_beds < MIN_UP_BEDS:
-                print(f"Not enough upper beds for {cabin.name}: {cabin.up_beds} < {MIN_UP_BEDS}")
-                continue
-            
-            filtered_cabins.append(cabin)
+# the occupancy, bed, bath and amenity criteria from config.py
+DEFAULT_CRITERIA = default_profile()
 
-    # Apply filters based on occupancy, beds, and baths
-    return filtered_cabins
+def passes_filters(cabin) -> bool:
+    return DEFAULT_CRITERIA.passes(cabin)
 
 def average_prices_for_weekends(cabin_prices_by_weekend):
     average_prices = {}
@@ -79,92 +96,125 @@ def average_prices_for_weekends(cabin_prices_by_weekend):
     
     return average_prices
 
-def least_expensive_weekend(average_prices):
-    return min(average_prices.items(), key=lambda x: x[1] if x[1] is not None else float('inf'))
-
-
-def report(cabin_prices_by_weekend: dict[str, list[KeyCabin]], average_prices):
-    lines = []
-    all_cabins_dict = {}
-    for weekend_name, cabins in cabin_prices_by_weekend.items():
-        lines.append(f"\nCabin prices for {weekend_name}:")
-        for cabin in cabins:
-            all_cabins_dict[cabin.name] = cabin
-            lines.append(f"  \"{cabin.name}\":")
-            lines.append(f"    Price: ${cabin.price:.2f}")
-            lines.append(f"    URL: {cabin.url}")
-            lines.append(f"    Occupancy: {cabin.occupancy}")
-            lines.append(f"    Upper Beds: {cabin.up_beds}")
-            lines.append(f"    Main Beds: {cabin.main_beds}")
-            lines.append(f"    Lower Beds: {cabin.low_beds}")
-            lines.append(f"    Score: {cabin.get_score()}")
-            if cabin.gar_beds > 0: lines.append(f"    Garage Beds: {cabin.gar_beds}")
-        avg_price = average_prices[weekend_name]
-        if avg_price is not None:
-            lines.append(f"Average price for {weekend_name}: ${avg_price:.2f}")
-        else:
-            lines.append(f"No cabins available for {weekend_name}.")
-    
-    cheapest_weekend, cheapest_price = least_expensive_weekend(average_prices)
-    if cheapest_price is not None:
-        lines.append(f"\nLeast Expensive Weekend: {cheapest_weekend}\nAverage Price: ${cheapest_price:.2f}")
-    else:
-        lines.append("\nNo weekends have available cabins.")
-
-    # for each cabin in the all-cabins dict
-    lines.append(f"\nCabin amenities:")
-    for cabin in all_cabins_dict.values():
-        #add lines for the optional amenities
-        lines.append(f"  {cabin.name}:")
-
-        for amenity in [a for a in cabin.amenities if a not in [ra.name for ra in REQUIRED_AMENITIES]]:
-            lines.append(f"    - {amenity}")
-
-    if len(scrape.get_cabins_needing_url_names()) > 0:
-        lines.append("\nRejected cabins:")
-        for cabin_name in scrape.get_cabins_needing_url_names():
-            lines.append(f"  - {cabin_name}")
-
-    return "\n".join(lines)
-
-
-def main():
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description='Search for cabins and generate reports')
-    parser.add_argument('--output', '-o', 
-                       default='cabin-report.html',
-                       help='filename for the HTML output report (default: cabin-report.html)')
-    args = parser.parse_args()
-    
-    print("Begin scraping of Railey Cabins for Syndicate")
-    cabin_price_list_by_weekend = {}
-    for weekend in SUMMER_WEEKENDS_2026:
-        cabins = prices_for_cabins_on_weekend(weekend)
-        name = weekend[0]
-        cabin_price_list_by_weekend[name] = cabins
-        
-
+def write_reports(cabin_price_list_by_weekend: dict, output: str = 'cabin-report.html', paged: bool = False, split_months: bool = False, months_to_include: set[str] = {"June", "July", "August"}):
+    # scrape pulls in requests, bs4 and cabin, so only load it once we know we are scraping
+    import scrape
     average_price_of_cabin_by_weekend = average_prices_for_weekends(cabin_price_list_by_weekend)
-    cabin_report = report(cabin_price_list_by_weekend, average_price_of_cabin_by_weekend)
+
+    # Build the report model once; both writers render from it
+    required_amenity_names = [amenity.name for amenity in REQUIRED_AMENITIES]
+    report_model = report_formatter.build_report_model(
+        cabin_price_list_by_weekend,
+        average_price_of_cabin_by_weekend,
+        required_amenity_names,
+        scrape.get_cabins_needing_url_names()
+    )
+    cabin_report = report_formatter.generate_yaml_report(report_model)
     with open('cabin-report.yml', 'w') as f:
         f.write(cabin_report)
     
-    print("Scraping complete. Report written to cabin-report.yml")
+    print("Report written to cabin-report.yml")
     
-    # Generate HTML report directly from Python data structures
+    write_html_report(report_model, output, paged, split_months, months_to_include)
+
+def write_html_report(report_model, output: str = 'cabin-report.html', paged: bool = False, split_months: bool = False, months_to_include: set[str] = {"June", "July", "August"}):
+    # Generate HTML report directly from the report model
     print("Generating HTML report...")
-    months_to_include = {"June", "July", "August"}
-    required_amenity_names = [amenity.name for amenity in REQUIRED_AMENITIES]
-    data_dict = report_formatter.build_data_from_python(
-        cabin_price_list_by_weekend, 
-        average_price_of_cabin_by_weekend,
-        required_amenity_names
-    )
-    html_output = report_formatter.format(data_dict, months_to_include)
-    with open(args.output, 'w') as f:
+    if paged:
+        import report_paged
+        report_paged.write_paged_report(report_model, output, months_to_include, split_months)
+        print(f"Paged HTML report generated: {output}")
+        return
+
+    row_cache = report_formatter.RowFragmentCache(report_formatter.row_cache_path(output))
+    html_output = report_formatter.format(report_model, months_to_include, row_cache)
+    with open(output, 'w') as f:
         f.write(html_output)
+    row_cache.save()
     
-    print(f"HTML report generated: {args.output}")
+    print(f"HTML report generated: {output} ({row_cache.stats()})")
+
+def main(argv: list[str] = None):
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='Search for cabins and generate reports')
+    parser.add_argument('--output', '-o', 
+                       default='cabin-report.html',
+                       help='filename for the HTML output report (default: cabin-report.html)')
+    parser.add_argument('--paged', action='store_true',
+                       help='write a small HTML shell plus a lazily loaded data file instead of one inline table')
+    parser.add_argument('--split-months', action='store_true',
+                       help='with --paged, write one data file per month')
+    parser.add_argument('--refresh-details', action='store_true',
+                       help='ignore the saved cabin details and scrape every detail page again')
+    parser.add_argument('--resume', action='store_true',
+                       help='continue an interrupted run, skipping the weekends and cabin details it already finished')
+    parser.add_argument('--profile', action='append',
+                       help='only evaluate this search profile from config.PROFILES ("default" is the criteria in config.py); repeat for more (default: all)')
+    parser.add_argument('--memtrace', action='store_true',
+                       help='record peak and retained memory per phase, pipeline stage and module, appending the figures to memtrace.jsonl')
+    parser.add_argument('--mem-budget', action='append', metavar='NAME=MB',
+                       help='with --memtrace, a peak budget such as stage:detail=200 or total=500, added to config.MEMORY_BUDGETS')
+    parser.add_argument('--memtrace-fail', action='store_true',
+                       help='with --memtrace, fail the run instead of warning when a budget is exceeded')
+    args = parser.parse_args(argv)
+    try:
+        profiles = load_profiles(args.profile)
+    except ValueError as e:
+        parser.error(str(e))
+
+    tracer = None
+    if args.memtrace:
+        import memtrace
+        from config import MEMORY_BUDGETS
+        try:
+            budgets = {**MEMORY_BUDGETS, **memtrace.parse_budgets(args.mem_budget)}
+        except ValueError as e:
+            parser.error(str(e))
+        tracer = memtrace.pipeline_tracer(write_html_report, budgets, args.memtrace_fail)
+        tracer.start()
+    # without --memtrace the phases are not measured
+    phase = tracer.phase if tracer is not None else lambda name: contextlib.nullcontext()
+
+    with phase("startup"):
+        print("Begin scraping of Railey Cabins for Syndicate")
+        import scrape
+        if not args.refresh_details:
+            print(f"Loaded {scrape.load_detail_cache()} saved cabin details")
+        # finished weekends and fetched details are journaled as they come in, so an interrupted run can be resumed
+        from checkpoint import Checkpoint
+        checkpoint = Checkpoint()
+        if args.resume:
+            if checkpoint.load():
+                restored = checkpoint.restore_details()
+                print(f"Resuming from {checkpoint.path}: {len(checkpoint.windows)} finished weekend(s), {restored} cabin details")
+            else:
+                print(f"No checkpoint found at {checkpoint.path}, starting from scratch")
+        checkpoint.start(resume=args.resume)
+
+    with phase("scraping"):
+        # search, detail fetching, filtering and the report writers run as one streaming pipeline;
+        # every window any profile needs is searched once and all profiles share the results
+        import pipeline
+        windows = union_windows(profiles, SUMMER_WEEKENDS_2026)
+        # a profile that picks its own weekends reports all of them, whatever the month
+        months = {profile.name: {"June", "July", "August"} if profile.windows is None else None for profile in profiles}
+        profiles = [dataclasses.replace(profile, windows=profile.windows or SUMMER_WEEKENDS_2026) for profile in profiles]
+        outputs = [(profile, profile.report_paths(args.output)[0]) for profile in profiles]
+        report_models = pipeline.run_profiles(windows, outputs, checkpoint)
+        scrape.save_detail_cache()
+        checkpoint.finish()
+
+    with phase("reporting"):
+        for profile in profiles:
+            yaml_path, html_path = profile.report_paths(args.output)
+            print(f"Report written to {yaml_path}")
+            write_html_report(report_models[profile.name], html_path, args.paged, args.split_months, months[profile.name])
+
+    if tracer is not None:
+        try:
+            tracer.finish(MEMTRACE_HISTORY)
+        except memtrace.MemoryBudgetExceeded as e:
+            raise SystemExit(f"Failing the run, memory budget exceeded: {e}")
 
 
 if __name__ == "__main__":
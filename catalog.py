@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+#catalog.py
+
+import argparse
+from typing import List
+from report_model import ReportModel
+
+
+def load_catalog(report_path: str) -> ReportModel:
+    """Load the cabins recorded in an existing YAML report, without scraping."""
+    from report_formatter import parse_cabin_data
+    with open(report_path, 'r') as f:
+        return ReportModel.from_dict(parse_cabin_data(f.read()))
+
+
+def format_catalog(model: ReportModel, min_occupancy: int = 0, amenity: str = None) -> str:
+    lines = []
+    for row in sorted(model.cabins.values(), key=lambda r: r.name):
+        if not row.prices or row.occupancy < min_occupancy:
+            continue
+        if amenity and amenity not in row.amenities:
+            continue
+        amenities = ", ".join(sorted(set(row.amenities))) or "-"
+        lines.append(f"{row.name}: occupancy {row.occupancy}, beds {row.up_beds}/{row.main_beds}/{row.low_beds}/{row.gar_beds} (upper/main/lower/garage), amenities: {amenities}")
+        lines.append(f"    {row.url}")
+    lines.append(f"{len(lines) // 2} cabins")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='List the cabins recorded in an existing report')
+    parser.add_argument('--input', '-i',
+                       default='cabin-report.yml',
+                       help='YAML report to read (default: cabin-report.yml)')
+    parser.add_argument('--min-occupancy', type=int, default=0,
+                       help='only list cabins sleeping at least this many')
+    parser.add_argument('--amenity',
+                       help='only list cabins with this optional amenity (e.g. Pool)')
+    args = parser.parse_args(argv)
+
+    print(format_catalog(load_catalog(args.input), args.min_occupancy, args.amenity))
+
+
+if __name__ == "__main__":
+    main()
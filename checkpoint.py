@@ -0,0 +1,95 @@
+#checkpoint.py
+# Append-only journal of a scrape run, so an interrupted run can pick up where
+# it stopped. Each fetched cabin detail and each finished weekend (its cabins
+# with prices, before filtering, so every profile can be evaluated again) is
+# written as one JSON line as soon as it is known.
+# A --resume run reloads the journal, skips the weekends already finished and
+# reuses the details already fetched; only what was in flight is redone. The
+# journal is removed once a run completes.
+
+import json
+import os
+import threading
+from typing import Dict, List
+
+DEFAULT_PATH = "scrape-checkpoint.jsonl"
+
+
+class Checkpoint:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        # window tuple -> KeyCabin dicts with prices
+        self.windows: Dict[tuple, List[Dict]] = {}
+        # cabin name -> (KeyCabin dict, rejected)
+        self.details: Dict[str, tuple] = {}
+        self._f = None
+        self._lock = threading.Lock()
+        self._journaled = set()
+
+    def load(self) -> bool:
+        """Read an existing journal. Returns False if there is none."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the last line may be cut short if the run was killed mid-write
+                    continue
+                if record.get("type") == "window":
+                    self.windows[tuple(record["window"])] = record["cabins"]
+                elif record.get("type") == "detail":
+                    self.details[record["cabin"]["name"]] = (record["cabin"], record.get("rejected", False))
+        return True
+
+    def start(self, resume: bool = False):
+        """Open the journal for writing; a fresh run discards any earlier journal."""
+        self._journaled = set(self.details) if resume else set()
+        if resume and os.path.exists(self.path):
+            # a killed run can leave the last line unterminated; new records must start on a line of their own
+            with open(self.path, 'rb+') as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    try:
+                        json.loads(data[end:])
+                        f.write(b"\n")
+                    except ValueError:
+                        # cut short mid-record; load() skipped it too
+                        f.truncate(end)
+        self._f = open(self.path, 'a' if resume else 'w')
+
+    def restore_details(self) -> int:
+        """Put the journaled details back into scrape's cache. Returns how many were restored."""
+        import scrape
+        from cabin import KeyCabin
+        for name, (d, rejected) in self.details.items():
+            scrape.cabin_key_details_dict[name] = KeyCabin.from_dict(d)
+            if rejected and name not in scrape.cabins_needing_url_names:
+                scrape.cabins_needing_url_names.append(name)
+        return len(self.details)
+
+    def _write(self, record: Dict):
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def detail(self, key_cabin, rejected: bool = False):
+        """Record a cabin's details (without a price); each cabin is written once."""
+        with self._lock:
+            if key_cabin.name in self._journaled:
+                return
+            self._journaled.add(key_cabin.name)
+        d = key_cabin.to_dict()
+        d["price"] = 0.0
+        self._write({"type": "detail", "cabin": d, "rejected": rejected})
+
+    def window_done(self, window: tuple, key_cabins: List):
+        self._write({"type": "window", "window": list(window), "cabins": [c.to_dict() for c in key_cabins]})
+
+    def finish(self):
+        """The run completed; nothing is left to resume."""
+        self._f.close()
+        os.remove(self.path)
@@ -9,6 +9,13 @@ MAX_BATHS = 14
 
 MIN_UP_BEDS = 2
 
+# seconds a search response is reused by later runs and other tools; 0 disables the cache
+SEARCH_CACHE_TTL = 15 * 60
+
+# peak memory budgets in MB for cabin_search.py --memtrace, e.g. {"stage:detail": 200, "total": 500};
+# exceeding one prints a warning, or fails the run with --memtrace-fail
+MEMORY_BUDGETS = {}
+
 REQUIRED_AMENITIES = [
     Amenity("Grill", ["Grills (Gas)"]), 
     Amenity("A/C",["A/C: Central Air"]), 
@@ -19,4 +26,14 @@ OPTIONAL_AMENITIES = [
     Amenity("Pool", ["Swimming Pool (Community)", "Swimming Pool (Private)", "CARC"]), 
     Amenity("Pool Table", ["Pool Table"]), 
     Amenity("Home Theater", ["Home Theater"])
-] 
\ No newline at end of file
+] 
+# Extra named search profiles, evaluated over the same scrape as the criteria
+# above. Each entry overrides only the values it names and writes its own
+# cabin-report-<name>.yml/.html. "windows" (same tuples as
+# cabin_search.SUMMER_WEEKENDS_2026) replaces the summer weekends for that
+# profile: it reports only those weekends, and any not already searched for
+# another profile are added to the run.
+PROFILES = [
+    # {"name": "big-group", "min_occupancy": 18, "max_occupancy": 30, "min_up_beds": 3},
+    # {"name": "pool", "required_amenities": REQUIRED_AMENITIES + [OPTIONAL_AMENITIES[0]]},
+]
@@ -0,0 +1,158 @@
+#detail_parser.py
+# Incremental parser for cabin detail pages. It is fed the page a chunk at a
+# time and reports when every field the scraper needs has been seen, so the
+# rest of the page (reviews, scripts, galleries) never has to be downloaded.
+
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+LODGING_CLASSES = {"rc-lodging-beds": "beds", "rc-lodging-baths": "baths", "rc-lodging-occ": "occupancy"}
+AMENITY_CLASS = "amenity-list-item"
+# the page sections the scraper can ask for; the lodging counts are always read
+SECTIONS = {"lodging", "amenities", "bedrooms"}
+# complete() is checked this often within a downloaded chunk, so parsing stops soon after the last needed element;
+# text split across slices is buffered until whole (see DetailParser._flush_text)
+FEED_SIZE = 2048
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class DetailParser(HTMLParser):
+    def __init__(self, bed_labels: Iterable[str], sections: Iterable[str] = SECTIONS):
+        super().__init__()
+        self.bed_labels = list(bed_labels)
+        self.sections = set(sections) | {"lodging"}
+        # sections not asked for are skipped, not just left out of complete()
+        self._want_amenities = "amenities" in self.sections
+        self._want_bedrooms = "bedrooms" in self.sections
+
+        # results, in the same shape the BeautifulSoup extraction produces
+        self.lodging_text = {}                                   # "beds"/"baths"/"occupancy" -> element text
+        self.amenity_items = []                                  # text nodes of each amenity list item
+        self.bed_label_counts = {label: 0 for label in self.bed_labels}
+
+        # bytes downloaded, which can be more than were parsed
+        self.bytes_read = 0
+        # a chunk can end part way through a multi-byte character
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._stack = []
+        # for each open element, whether its class names an amenity section
+        self._amenity_sections = []
+        self._lodging_field = None
+        self._lodging_depth = None
+        self._amenity_depth = None
+        self._amenity_container_depth = None
+        self._amenity_container_closed = False
+        # a text node can arrive in pieces (feed() flushes text at the end of
+        # every call), so it is only matched once the next tag shows it is whole
+        self._text = []
+
+    def feed_bytes(self, chunk: bytes):
+        self.feed(self._decoder.decode(chunk))
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        self._stack.append(tag)
+        classes = (dict(attrs).get("class") or "").split()
+        self._amenity_sections.append(any("amenit" in cls for cls in classes))
+        for cls in classes:
+            if cls in LODGING_CLASSES and LODGING_CLASSES[cls] not in self.lodging_text and self._lodging_field is None:
+                self._lodging_field = LODGING_CLASSES[cls]
+                self._lodging_depth = len(self._stack)
+                self.lodging_text[self._lodging_field] = ""
+        if self._want_amenities and AMENITY_CLASS in classes and tag == "li":
+            if self._amenity_container_depth is None:
+                self._amenity_container_depth = self._container_depth()
+            self._amenity_depth = len(self._stack)
+            self.amenity_items.append([])
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag not in self._stack:
+            # stray end tag; browsers ignore these too
+            return
+        # pop up to the matching start tag, closing anything left open inside it
+        while self._stack:
+            self._amenity_sections.pop()
+            if self._stack.pop() == tag:
+                break
+        depth = len(self._stack)
+        if self._lodging_depth is not None and depth < self._lodging_depth:
+            self.lodging_text[self._lodging_field] = self.lodging_text[self._lodging_field].strip()
+            self._lodging_field = self._lodging_depth = None
+        if self._amenity_depth is not None and depth < self._amenity_depth:
+            self._amenity_depth = None
+        if self._amenity_container_depth is not None and depth < self._amenity_container_depth:
+            self._amenity_container_closed = True
+
+    def _container_depth(self) -> int:
+        """Depth of the element holding every amenity list, found from the first amenity item.
+
+        Pages can split amenities into several category lists, each possibly
+        in its own wrapper, so this is the outermost ancestor whose class names
+        an amenity section. Without one there is no telling where the lists
+        end, and 0 keeps the amenities open to the end of the page.
+        """
+        # the item is at depth len(self._stack); its ancestors are above it
+        for depth in range(1, len(self._stack)):
+            if self._amenity_sections[depth - 1]:
+                return depth
+        return 0
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = "".join(self._text)
+        self._text = []
+        if self._lodging_field is not None:
+            self.lodging_text[self._lodging_field] += data
+        if self._amenity_depth is not None:
+            self.amenity_items[-1].append(data)
+        if self._want_bedrooms:
+            for label in self.bed_labels:
+                if label in data:
+                    self.bed_label_counts[label] += 1
+
+    def bedrooms(self) -> Optional[int]:
+        digits = ''.join(filter(str.isdigit, self.lodging_text.get("beds", "")))
+        return int(digits) if digits else None
+
+    def complete(self) -> bool:
+        """True once every requested section (lodging counts, every amenity list, every bedroom label) has been seen."""
+        if len(self.lodging_text) < len(LODGING_CLASSES) or self._lodging_field is not None:
+            return False
+        if self._want_amenities and not self._amenity_container_closed:
+            return False
+        if self._want_bedrooms:
+            # the bedroom listing is done once it accounts for every advertised bedroom
+            bedrooms = self.bedrooms()
+            return bedrooms is not None and sum(self.bed_label_counts.values()) >= bedrooms
+        return True
+
+
+def parse_stream(chunks: Iterable[bytes], bed_labels: Iterable[str], sections: Iterable[str] = SECTIONS) -> DetailParser:
+    """Feed chunks to a DetailParser, stopping as soon as it has the requested sections."""
+    parser = DetailParser(bed_labels, sections)
+    for chunk in chunks:
+        parser.bytes_read += len(chunk)
+        for start in range(0, len(chunk), FEED_SIZE):
+            parser.feed_bytes(chunk[start:start + FEED_SIZE])
+            if parser.complete():
+                return parser
+    parser.close()
+    return parser
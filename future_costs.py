@@ -1,21 +1,31 @@
 #!/usr/bin/python3
 #future-costs.py
 
-import cabin_search
+import argparse
 import statistics
-from cabin import KeyCabin
-import scrape
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cabin import KeyCabin
 
 # WEEKEND = ("July Weekend 3", "07", "17", "2026", "07", "20", "2026")
 
-def averge_cabin_price(cabins: list[KeyCabin], occupancy: int) -> float:
+def averge_cabin_price(cabins: list["KeyCabin"], occupancy: int) -> float:
     return statistics.mean([cabin.price for cabin in cabins if cabin.occupancy == occupancy])
 
 
-def main():
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Average cabin prices by occupancy for a single weekend')
+    parser.parse_args(argv)
+    import scrape
+    scrape.load_detail_cache()
     print("Obtaiing costs")
     res = scrape.search("07", "17", "2026", "07", "20", "2026")
-    cabins = scrape.process_cabin_list(res)
+    # only price and occupancy are read, so amenities and bedroom levels are never scraped for them
+    cabins = scrape.process_cabin_list(res, fields={"price", "occupancy"})
+    scrape.save_detail_cache()
+    if scrape.search_cache is not None:
+        print(scrape.search_cache.stats())
 
     print(f"2026 occupancy average price = {averge_cabin_price(cabins, 13)}")
     print(f"2027 occupancy average price = {averge_cabin_price(cabins, 15)}")
@@ -0,0 +1,214 @@
+#memtrace.py
+# Memory accounting for scrape runs (cabin_search.py --memtrace).
+#
+# tracemalloc records every allocation with its call stack. Allocations are
+# charged to a module: the innermost frame in one of this project's files, so
+# a BeautifulSoup tree built by scrape counts against scrape. They are also
+# charged to a pipeline stage: the stage function found on the stack. The
+# pipeline stages run concurrently, so their peaks come from snapshots taken
+# every SAMPLE_SECONDS and can miss short spikes between samples. The run's
+# phases (startup: loading caches; scraping: the pipeline; reporting: the
+# HTML reports) run one after another, so their peaks are exact. Budgets in MB can be set on the peak of
+# any phase, stage or module ("phase:reporting", "stage:detail",
+# "module:scrape") or of the whole run ("total"), and are checked when the
+# run ends.
+
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+SAMPLE_SECONDS = 1.0
+# deep enough to reach the stage function from inside bs4 or json
+TRACE_FRAMES = 64
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# installed packages can live inside the project too (a .venv in the repo)
+LIBRARY_DIRS = {"site-packages", "dist-packages"}
+MB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(Exception):
+    pass
+
+
+def code_range(func: Callable) -> tuple:
+    """File and line range of a function's body, for matching tracemalloc frames."""
+    code = func.__code__
+    lines = [line for _, _, line in code.co_lines() if line is not None]
+    return os.path.abspath(code.co_filename), code.co_firstlineno, max(lines)
+
+
+def parse_budgets(specs: List[str]) -> Dict[str, float]:
+    """Turn NAME=MB strings (e.g. stage:detail=200) into a budget dict."""
+    budgets = {}
+    for spec in specs or []:
+        name, sep, value = spec.partition('=')
+        if not sep:
+            raise ValueError(f"memory budget must look like NAME=MB, got {spec!r}")
+        budgets[name.strip()] = float(value)
+    return budgets
+
+
+class MemTracer:
+    def __init__(self, stages: Dict[str, List[Callable]], budgets: Dict[str, float] = None, fail: bool = False):
+        self.stage_ranges = [(name, code_range(func)) for name, funcs in stages.items() for func in funcs]
+        self.budgets = budgets or {}
+        self.fail = fail
+        # name -> [peak bytes, retained bytes]
+        self.phases: Dict[str, List[int]] = {}
+        self.stages: Dict[str, List[int]] = {name: [0, 0] for name in stages}
+        self.modules: Dict[str, List[int]] = {}
+        self.peak = 0
+        self._owners = {}
+        self._paths = {}
+        self._project_files = {}
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        tracemalloc.start(TRACE_FRAMES)
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+    def _owner(self, traceback) -> tuple:
+        """(stage, module) an allocation is charged to; tracebacks repeat, so this is memoised."""
+        owner = self._owners.get(traceback)
+        if owner is None:
+            stage = module = None
+            # frames run from the outermost call to the allocation itself
+            for frame in reversed(traceback):
+                if frame.filename.startswith("<"):
+                    # "<frozen importlib._bootstrap>" and the like; abspath would put them in the working directory
+                    continue
+                filename = self._paths.get(frame.filename)
+                if filename is None:
+                    filename = self._paths[frame.filename] = os.path.abspath(frame.filename)
+                if module is None and self._is_project_file(filename):
+                    module = os.path.splitext(os.path.basename(filename))[0]
+                if stage is None:
+                    for name, (range_file, first, last) in self.stage_ranges:
+                        if filename == range_file and first <= frame.lineno <= last:
+                            stage = name
+                            break
+                if stage is not None and module is not None:
+                    break
+            owner = self._owners[traceback] = (stage or "other", module or "other")
+        return owner
+
+    def _is_project_file(self, filename: str) -> bool:
+        project = self._project_files.get(filename)
+        if project is None:
+            project = filename.startswith(PROJECT_DIR) and filename != os.path.abspath(__file__)
+            if project:
+                parts = filename[len(PROJECT_DIR):].split(os.sep)
+                # a virtualenv is recognised by the pyvenv.cfg at its root
+                project = not (LIBRARY_DIRS & set(parts) or os.path.exists(os.path.join(PROJECT_DIR, parts[0], "pyvenv.cfg")))
+            self._project_files[filename] = project
+        return project
+
+    def _measure(self) -> tuple:
+        """Live bytes per stage and per module right now."""
+        # leave out the tracer's own bookkeeping
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+        by_stage = {}
+        by_module = {}
+        for stat in snapshot.statistics('traceback'):
+            stage, module = self._owner(stat.traceback)
+            by_stage[stage] = by_stage.get(stage, 0) + stat.size
+            by_module[module] = by_module.get(module, 0) + stat.size
+        return by_stage, by_module
+
+    def sample(self) -> tuple:
+        by_stage, by_module = self._measure()
+        for name, size in by_stage.items():
+            entry = self.stages.setdefault(name, [0, 0])
+            entry[0] = max(entry[0], size)
+        for name, size in by_module.items():
+            entry = self.modules.setdefault(name, [0, 0])
+            entry[0] = max(entry[0], size)
+        return by_stage, by_module
+
+    def _sample_loop(self):
+        while not self._stop.wait(SAMPLE_SECONDS):
+            self.sample()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Measure a part of the run that does not overlap the others."""
+        start_current, start_peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, start_peak)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            self.phases[name] = [peak - start_current, current - start_current]
+
+    def stop(self):
+        """Take the final sample: whatever is still allocated is retained."""
+        self._stop.set()
+        self._sampler.join()
+        by_stage, by_module = self.sample()
+        for name, entry in self.stages.items():
+            entry[1] = by_stage.get(name, 0)
+        for name, entry in self.modules.items():
+            entry[1] = by_module.get(name, 0)
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    def over_budget(self) -> List[str]:
+        peaks = {"total": self.peak}
+        for kind, group in (("module", self.modules), ("stage", self.stages), ("phase", self.phases)):
+            for name, (peak, _) in group.items():
+                peaks[f"{kind}:{name}"] = peak
+        problems = []
+        for name, budget in self.budgets.items():
+            if name not in peaks:
+                problems.append(f"{name}: nothing measured under that name")
+            elif peaks[name] > budget * MB:
+                problems.append(f"{name}: peak {peaks[name] / MB:.1f} MB over budget of {budget:g} MB")
+        return problems
+
+    def report(self) -> str:
+        lines = [f"Memory: peak {self.peak / MB:.1f} MB traced"]
+        lines.append(f"  {'':<28}{'peak MB':>10}{'retained MB':>13}")
+        for kind, group in (("phase", self.phases), ("stage", self.stages), ("module", self.modules)):
+            for name, (peak, retained) in sorted(group.items(), key=lambda item: -item[1][0]):
+                lines.append(f"  {kind + ':' + name:<28}{peak / MB:>10.1f}{retained / MB:>13.1f}")
+        lines.append(f"  (stage and module peaks are sampled every {SAMPLE_SECONDS:g}s and can miss short spikes)")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        def mb(group):
+            return {name: {"peak_mb": round(peak / MB, 2), "retained_mb": round(retained / MB, 2)} for name, (peak, retained) in group.items()}
+        return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "peak_mb": round(self.peak / MB, 2),
+                "phases": mb(self.phases), "stages": mb(self.stages), "modules": mb(self.modules)}
+
+    def finish(self, history_path: str = None):
+        """Stop tracing, print the report, and warn about or fail on exceeded budgets."""
+        self.stop()
+        print(self.report())
+        if history_path:
+            import json
+            # one line per run, so memory growth can be followed as the catalog grows
+            with open(history_path, 'a') as f:
+                f.write(json.dumps(self.to_dict()) + "\n")
+        problems = self.over_budget()
+        for problem in problems:
+            print(f"Memory budget exceeded - {problem}")
+        if problems and self.fail:
+            raise MemoryBudgetExceeded("; ".join(problems))
+
+
+def pipeline_tracer(html_writer: Callable, budgets: Dict[str, float] = None, fail: bool = False) -> MemTracer:
+    """A tracer for cabin_search's pipeline: search, detail and filter/write stages plus the HTML writer."""
+    import pipeline
+    return MemTracer({
+        "search": [pipeline.search_stage],
+        "detail": [pipeline.detail_stage],
+        "filter-write": [pipeline.run_profiles],
+        "html": [html_writer],
+    }, budgets, fail)
@@ -0,0 +1,249 @@
+#pipeline.py
+# Streaming scrape pipeline: search -> detail -> filter -> writers.
+#
+# Each stage runs in its own thread(s) and hands cabins to the next through a
+# bounded queue, so a slow stage holds back the ones before it instead of
+# letting results pile up. Cabins flow through one at a time: the YAML report
+# is written a weekend at a time as soon as each weekend's cabins are all in,
+# and the only thing kept for the whole run is the compact report model (one
+# small price cell per cabin and weekend) that the HTML table is sorted from.
+# With several search profiles, each window and cabin is still fetched once;
+# every profile filters the shared results and writes its own report.
+
+import copy
+import json
+import os
+import queue
+import threading
+from collections import deque
+from typing import Dict, List
+
+from profiles import DEFAULT_PROFILE
+
+QUEUE_SIZE = 64
+DETAIL_WORKERS = 32   # upper bound only; scrape's adaptive limiter decides how many requests are in flight
+
+
+class WindowStart:
+    """Sent ahead of a window's cabins so the writer knows how many to expect."""
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+
+
+class PipelineError(Exception):
+    pass
+
+
+def search_stage(windows: List[tuple], detail_queue: queue.Queue, result_queue: queue.Queue, errors: list):
+    import scrape
+    from cabin import Cabin
+    try:
+        for name, bm, bd, by, em, ed, ey in windows:
+            print(f"Processing {name}...")
+            items = json.loads(scrape.search(bm, bd, by, em, ed, ey))
+            result_queue.put(WindowStart(name, len(items)))
+            for item in items:
+                detail_queue.put((name, Cabin.from_dict(item)))
+    except Exception as e:
+        errors.append(e)
+    finally:
+        for _ in range(DETAIL_WORKERS):
+            detail_queue.put(None)
+
+
+def detail_stage(detail_queue: queue.Queue, result_queue: queue.Queue, checkpoint=None):
+    import scrape
+    while True:
+        item = detail_queue.get()
+        if item is None:
+            return
+        window_name, cabin = item
+        try:
+            details = scrape.cached_key_cabin_details(cabin.name)
+            if checkpoint is not None:
+                checkpoint.detail(details, cabin.name in scrape.cabins_needing_url_names)
+            key_cabin = copy.copy(details)
+            key_cabin.price = cabin.get_price()
+        except Exception as e:
+            print(f"Could not get details for {cabin.name}: {e}")
+            key_cabin = None
+        # always forward something so the writer can tell when the window is complete
+        result_queue.put((window_name, key_cabin))
+
+
+class WindowProgress:
+    """How many of a window's cabins have come through, shared by every profile."""
+    def __init__(self, window: tuple):
+        self.window = window
+        self.expected = None
+        self.received = 0
+        # every cabin with details, kept only for the checkpoint journal
+        self.key_cabins = []
+        self.resumed = False
+
+    def complete(self) -> bool:
+        return self.expected is not None and self.received >= self.expected
+
+
+class OpenWindow:
+    """One profile's view of a window: the cabins that passed its filters."""
+    def __init__(self, progress: WindowProgress, weekend):
+        self.progress = progress
+        self.weekend = weekend
+        self.entries = []
+        self.total = 0.0
+
+
+class ProfileReport:
+    """A profile's report model and YAML writer, filled in as windows complete."""
+    def __init__(self, profile, f, verbose: bool = True):
+        import report_formatter
+        from report_model import ReportModel
+        self.profile = profile
+        # only one profile explains why cabins were filtered out
+        self.verbose = verbose
+        self.required = set(profile.required_names())
+        self.model = ReportModel()
+        self.writer = report_formatter.YamlReportWriter(f)
+        self.open_windows = deque()
+        self.by_name = {}
+
+    def open(self, progress: WindowProgress):
+        window = OpenWindow(progress, self.model.add_weekend(progress.window[0]))
+        self.open_windows.append(window)
+        self.by_name[window.weekend.name] = window
+
+    def add(self, window_name: str, key_cabin):
+        window = self.by_name.get(window_name)
+        if window is not None and self.profile.passes(key_cabin, self.verbose):
+            cell = self.model.add_cabin(window.weekend, key_cabin, self.required)
+            window.entries.append((self.model.cabins[key_cabin.name], cell))
+            window.total += cell.price
+
+    def flush(self):
+        # the YAML report is written in search order as the front windows complete
+        while self.open_windows and self.open_windows[0].progress.complete():
+            window = self.open_windows.popleft()
+            del self.by_name[window.weekend.name]
+            count = len(window.entries)
+            window.weekend.average = window.total / count if count else None
+            self.writer.write_weekend(window.weekend.name, window.entries, window.weekend.average)
+            label = f" ({self.profile.name})" if self.profile.name != DEFAULT_PROFILE else ""
+            print(f"Finished {window.weekend.name}{label}: {count} cabins")
+
+
+def run(windows: List[tuple], yaml_path: str, checkpoint=None):
+    """Scrape the windows with the criteria in config.py, writing the YAML report to yaml_path.
+
+    Returns the report model for the HTML writers.
+    """
+    from profiles import default_profile
+    profile = default_profile()
+    return run_profiles(windows, [(profile, yaml_path)], checkpoint)[profile.name]
+
+
+def run_profiles(windows: List[tuple], outputs: List[tuple], checkpoint=None) -> Dict:
+    """Scrape the windows once and evaluate every profile over the results.
+
+    outputs holds (SearchProfile, YAML path) pairs; a profile with its own
+    windows only reports those, the others report every window. With a
+    checkpoint, weekends it already holds are not searched again and each
+    weekend is journaled as it completes. Returns each profile's report model,
+    keyed by profile name, for the HTML writers.
+    """
+    import scrape
+    from cabin import KeyCabin
+
+    progress = {}
+    for window in windows:
+        progress[window[0]] = WindowProgress(tuple(window))
+        saved = checkpoint.windows.get(tuple(window)) if checkpoint is not None else None
+        if saved is not None:
+            progress[window[0]].resumed = True
+    pending = [window for window in windows if not progress[window[0]].resumed]
+    if len(pending) < len(windows):
+        print(f"Resuming: {len(windows) - len(pending)} weekend(s) already done, {len(pending)} to go")
+
+    # reports are written beside the last good ones and only replace them once complete
+    tmp_paths = [yaml_path + ".tmp" for _, yaml_path in outputs]
+    files = [open(tmp_path, 'w') for tmp_path in tmp_paths]
+    try:
+        reports = [ProfileReport(profile, f, verbose=i == 0) for i, ((profile, _), f) in enumerate(zip(outputs, files))]
+        for report in reports:
+            wanted = {tuple(w) for w in report.profile.windows} if report.profile.windows is not None else None
+            # every window in search order, so the YAML report keeps that order even when some are resumed
+            for window in windows:
+                if wanted is None or tuple(window) in wanted:
+                    report.open(progress[window[0]])
+        for window in windows:
+            if progress[window[0]].resumed:
+                for d in checkpoint.windows[tuple(window)]:
+                    key_cabin = KeyCabin.from_dict(d)
+                    for report in reports:
+                        report.add(window[0], key_cabin)
+                progress[window[0]].expected = 0
+
+        detail_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        result_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        errors = []
+
+        searcher = threading.Thread(target=search_stage, args=(pending, detail_queue, result_queue, errors), daemon=True)
+        workers = [threading.Thread(target=detail_stage, args=(detail_queue, result_queue, checkpoint), daemon=True) for _ in range(DETAIL_WORKERS)]
+        searcher.start()
+        for worker in workers:
+            worker.start()
+
+        def close_results():
+            searcher.join()
+            for worker in workers:
+                worker.join()
+            result_queue.put(None)
+        threading.Thread(target=close_results, daemon=True).start()
+
+        def window_received(window: WindowProgress):
+            if window.complete() and checkpoint is not None:
+                checkpoint.window_done(window.window, window.key_cabins)
+                window.key_cabins = []
+
+        for report in reports:
+            report.flush()
+        while True:
+            item = result_queue.get()
+            if item is None:
+                break
+            if isinstance(item, WindowStart):
+                window = progress[item.name]
+                window.expected = item.count
+            else:
+                window_name, key_cabin = item
+                window = progress[window_name]
+                window.received += 1
+                if key_cabin is not None:
+                    if checkpoint is not None:
+                        window.key_cabins.append(key_cabin)
+                    for report in reports:
+                        report.add(window_name, key_cabin)
+            window_received(window)
+            for report in reports:
+                report.flush()
+
+        if errors:
+            raise PipelineError(f"search failed: {errors[0]}") from errors[0]
+        unfinished = [name for name, window in progress.items() if not window.complete()]
+        if unfinished:
+            raise PipelineError(f"stopped before finishing {', '.join(unfinished)}")
+
+        if scrape.search_cache is not None:
+            print(scrape.search_cache.stats())
+        rejected = list(scrape.get_cabins_needing_url_names())
+        for report in reports:
+            report.model.rejected = rejected
+            report.writer.close(rejected)
+    finally:
+        for f in files:
+            f.close()
+    for tmp_path, (_, yaml_path) in zip(tmp_paths, outputs):
+        os.replace(tmp_path, yaml_path)
+
+    return {report.profile.name: report.model for report in reports}
@@ -0,0 +1,112 @@
+#profiles.py
+# Named search profiles. The default profile is the criteria at the top of
+# config.py; config.PROFILES adds more, each overriding only the values it
+# names. One scrape fetches every window and cabin once and all profiles are
+# evaluated over the shared results, each writing its own reports.
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from amenity import Amenity
+
+DEFAULT_PROFILE = "default"
+
+
+@dataclass
+class SearchProfile:
+    name: str
+    min_occupancy: int
+    max_occupancy: int
+    min_beds: int
+    max_beds: int
+    min_baths: int
+    max_baths: int
+    min_up_beds: int
+    required_amenities: List[Amenity] = field(default_factory=list)
+    # weekend tuples like cabin_search.SUMMER_WEEKENDS_2026; None means the run's weekends
+    windows: Optional[List[tuple]] = None
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "SearchProfile":
+        """Build a profile from a config.PROFILES entry; values it leaves out come from config.py."""
+        import config
+        return cls(
+            name=d.get("name", DEFAULT_PROFILE),
+            min_occupancy=d.get("min_occupancy", config.MIN_OCCUPANCY),
+            max_occupancy=d.get("max_occupancy", config.MAX_OCCUPANCY),
+            min_beds=d.get("min_beds", config.MIN_BEDS),
+            max_beds=d.get("max_beds", config.MAX_BEDS),
+            min_baths=d.get("min_baths", config.MIN_BATHS),
+            max_baths=d.get("max_baths", config.MAX_BATHS),
+            min_up_beds=d.get("min_up_beds", config.MIN_UP_BEDS),
+            required_amenities=list(d.get("required_amenities", config.REQUIRED_AMENITIES)),
+            windows=[tuple(w) for w in d["windows"]] if d.get("windows") is not None else None,
+        )
+
+    def required_names(self) -> List[str]:
+        return [amenity.name for amenity in self.required_amenities]
+
+    def passes(self, cabin, verbose: bool = True) -> bool:
+        if not (self.min_occupancy <= cabin.occupancy <= self.max_occupancy and self.min_beds <= cabin.beds <= self.max_beds and self.min_baths <= cabin.baths <= self.max_baths):
+            return False
+        required = set(self.required_names())
+        if not (required <= set(cabin.amenities)):
+            if verbose:
+                print(f"Missing amenities for {cabin.name}: {required - set(cabin.amenities)}")
+            return False
+
+        if cabin.up_beds < self.min_up_beds:
+            if verbose:
+                print(f"Not enough upper beds for {cabin.name}: {cabin.up_beds} < {self.min_up_beds}")
+            return False
+
+        return True
+
+    def report_paths(self, output: str) -> tuple[str, str]:
+        """YAML and HTML report filenames; the default profile keeps the usual names."""
+        if self.name == DEFAULT_PROFILE:
+            return 'cabin-report.yml', output
+        stem, dot, ext = output.rpartition('.')
+        html_path = f"{stem}-{self.name}.{ext}" if dot else f"{output}-{self.name}"
+        return f"cabin-report-{self.name}.yml", html_path
+
+
+def default_profile() -> SearchProfile:
+    return SearchProfile.from_dict({})
+
+
+def load_profiles(names: List[str] = None) -> List[SearchProfile]:
+    """The default profile followed by config.PROFILES, or only the named ones."""
+    from config import PROFILES
+    profiles = [default_profile()] + [SearchProfile.from_dict(d) for d in PROFILES]
+    if names:
+        known = {profile.name for profile in profiles}
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise ValueError(f"unknown profile(s): {', '.join(unknown)} (known: {', '.join(sorted(known))})")
+        profiles = [profile for profile in profiles if profile.name in names]
+    return profiles
+
+
+def union_windows(profiles: List[SearchProfile], default_windows: List[tuple]) -> List[tuple]:
+    """Every window any profile needs, each once, in first-seen order."""
+    windows = []
+    seen = set()
+    for profile in profiles:
+        for window in profile.windows if profile.windows is not None else default_windows:
+            if tuple(window) not in seen:
+                seen.add(tuple(window))
+                windows.append(tuple(window))
+    return windows
+
+
+def profile_amenities() -> List[Amenity]:
+    """Required amenities named by profiles that the amenity lists in config.py do not already cover."""
+    from config import PROFILES, REQUIRED_AMENITIES, OPTIONAL_AMENITIES
+    known = {amenity.name for amenity in REQUIRED_AMENITIES + OPTIONAL_AMENITIES}
+    extra = []
+    for d in PROFILES:
+        for amenity in d.get("required_amenities", []):
+            if amenity.name not in known:
+                known.add(amenity.name)
+                extra.append(amenity)
+    return extra
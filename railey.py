@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+#railey.py
+# Single entry point. Each subcommand imports only the modules it needs, so
+# report-only and cache-only commands never load requests/bs4.
+
+import sys
+import importlib
+
+# subcommand -> (module providing main(argv), help text)
+COMMANDS = {
+    "scrape": ("cabin_search", "scrape cabin prices and write the YAML and HTML reports"),
+    "report": ("report_formatter", "regenerate the HTML report from an existing YAML report"),
+    "monitor": ("scheduler", "keep prices fresh, refreshing near and volatile weekends more often"),
+    "sweep": ("sweep", "shard a sweep across worker processes via a local queue file"),
+    "seed": ("seed_cache", "seed the cabin detail cache from earlier reports and snapshots"),
+    "diff": ("snapshot_diff", "report price, availability and amenity changes between two YAML reports"),
+    "costs": ("future_costs", "average cabin prices by occupancy for a single weekend"),
+    "catalog": ("catalog", "list the cabins recorded in an existing report"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: railey.py <command> [options]", "", "commands:"]
+    for name, (_, help_text) in COMMANDS.items():
+        lines.append(f"  {name:<10}{help_text}")
+    lines.append("")
+    lines.append("Run 'railey.py <command> --help' for the options of a command.")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None):
+    # argparse is deliberately not used here; each command's module owns its parser
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(COMMANDS[command][0])
+    module.main(rest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
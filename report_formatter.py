@@ -1,162 +1,99 @@
 #!/usr/bin/python3
 #report-formatter.py
 
-import yaml
 import argparse
+import hashlib
+import io
+import json
+import os
+import struct
 from typing import Dict, List, Set
-import statistics
-from datetime import datetime
+from report_model import ReportModel, CabinRow, PriceCell, average_price, average_score
 
 
 def parse_cabin_data(yaml_string: str) -> Dict:
     """Parse YAML cabin report from a string."""
+    # PyYAML is only needed when reading a report file, not when handed a model
+    import yaml
     data = yaml.safe_load(yaml_string)
     return data
 
-def build_data_from_python(cabin_prices_by_weekend: Dict, average_prices: Dict, required_amenities: List = None) -> Dict:
-    """Build the data structure directly from Python objects (KeyCabin instances).
+def build_report_model(cabin_prices_by_weekend: Dict, average_prices: Dict, required_amenities: List = None, rejected: List = None) -> ReportModel:
+    """Build the report model directly from Python objects (KeyCabin instances).
     
     Args:
         cabin_prices_by_weekend: Dict mapping weekend names to lists of KeyCabin objects
         average_prices: Dict mapping weekend names to average prices
         required_amenities: List of required amenity names to filter out from display
+        rejected: List of cabin names whose details could not be scraped
         
     Returns:
-        Dict in the same format as YAML-parsed data
+        ReportModel shared by the YAML and HTML writers
     """
-    if required_amenities is None:
-        required_amenities = []
-    
-    data = {}
-    all_cabins_dict = {}
-    
-    # Build cabin prices by weekend
-    for weekend_name, cabins in cabin_prices_by_weekend.items():
-        weekend_key = f"Cabin prices for {weekend_name}"
-        data[weekend_key] = {}
-        
-        for cabin in cabins:
-            all_cabins_dict[cabin.name] = cabin
-            cabin_info = {
-                'Price': f'${cabin.price:.2f}',
-                'URL': cabin.url,
-                'Occupancy': cabin.occupancy,
-                'Upper Beds': cabin.up_beds,
-                'Main Beds': cabin.main_beds,
-                'Lower Beds': cabin.low_beds,
-                'Score': cabin.get_score()
-            }
-            if cabin.gar_beds > 0:
-                cabin_info['Garage Beds'] = cabin.gar_beds
-            
-            data[weekend_key][cabin.name] = cabin_info
-        
-        # Add average price for this weekend
-        avg_price = average_prices.get(weekend_name)
-        if avg_price is not None:
-            data[f"Average price for {weekend_name}"] = f'${avg_price:.2f}'
-    
-    # Build amenities section (excluding required amenities)
-    data['Cabin amenities'] = {}
-    for cabin in all_cabins_dict.values():
-        optional_amenities = [a for a in cabin.amenities if a not in required_amenities]
-        if optional_amenities:
-            data['Cabin amenities'][cabin.name] = optional_amenities
+    return ReportModel.from_cabins(cabin_prices_by_weekend, average_prices, required_amenities or [], rejected or [])
+
+class YamlReportWriter:
+    """Writes the YAML text report incrementally, one completed weekend at a time."""
+
+    def __init__(self, f):
+        self.f = f
+        self.averages = {}
+        # cabin name -> optional amenities; one entry per cabin however many weekends it appears in
+        self.amenities = {}
+        self._sep = ""
+
+    def _line(self, line: str):
+        self.f.write(self._sep + line)
+        self._sep = "\n"
+
+    def write_weekend(self, weekend_name: str, entries: List, average: float = None):
+        """Write a weekend's section from (CabinRow, PriceCell) pairs."""
+        self._line(f"\nCabin prices for {weekend_name}:")
+        for row, cell in entries:
+            self.amenities[row.name] = row.amenities
+            self._line(f"  \"{row.name}\":")
+            self._line(f"    Price: ${cell.price:.2f}")
+            self._line(f"    URL: {row.url}")
+            self._line(f"    Occupancy: {row.occupancy}")
+            self._line(f"    Upper Beds: {row.up_beds}")
+            self._line(f"    Main Beds: {row.main_beds}")
+            self._line(f"    Lower Beds: {row.low_beds}")
+            self._line(f"    Score: {cell.score}")
+            if row.gar_beds > 0: self._line(f"    Garage Beds: {row.gar_beds}")
+        self.averages[weekend_name] = average
+        if average is not None:
+            self._line(f"Average price for {weekend_name}: ${average:.2f}")
         else:
-            data['Cabin amenities'][cabin.name] = None
-    
-    return data
+            self._line(f"No cabins available for {weekend_name}.")
 
-def extract_cabin_prices(data: Dict, months_to_include: Set[str]) -> Dict[str, Dict[str, Dict]]:
-    """Extract cabin prices, URLs, and bed information organized by cabin name and weekend."""
-    cabin_data = {}
-    
-    for weekend_key, weekend_data in data.items():
-        if not isinstance(weekend_data, dict):
-            continue
-            
-        # Extract month from weekend key (e.g., "Cabin prices for June Weekend 1")
-        parts = weekend_key.split()
-        if len(parts) >= 4:
-            month = parts[3]
-            if months_to_include and month not in months_to_include:
-                continue
-        
-        weekend_name = ' '.join(parts[3:])  # "June Weekend 1"
-        
-        for cabin, cabin_info in weekend_data.items():
-            if isinstance(cabin_info, dict) and 'Price' in cabin_info:
-                price_str = cabin_info['Price']
-                url = cabin_info.get('URL', '')
-                upper_beds = cabin_info.get('Upper Beds', 0)
-                main_beds = cabin_info.get('Main Beds', 0)
-                lower_beds = cabin_info.get('Lower Beds', 0)
-                garage_beds = cabin_info.get('Garage Beds', 0)
-                occupancy = cabin_info.get('Occupancy', 0)
-                score = cabin_info.get('Score', 0)
-                
-                if isinstance(price_str, str) and price_str.startswith('$'):
-                    price_value = float(price_str.replace('$', '').replace(',', ''))
-                    if cabin not in cabin_data:
-                        cabin_data[cabin] = {
-                            'prices': {}, 
-                            'scores': {},
-                            'url': url,
-                            'upper_beds': upper_beds,
-                            'main_beds': main_beds,
-                            'lower_beds': lower_beds,
-                            'garage_beds': garage_beds,
-                            'occupancy': occupancy
-                        }
-                    cabin_data[cabin]['prices'][weekend_name] = price_value
-                    cabin_data[cabin]['scores'][weekend_name] = score
-                    # Use the URL from any weekend (they should be the same)
-                    if not cabin_data[cabin]['url']:
-                        cabin_data[cabin]['url'] = url
-    
-    return cabin_data
-
-def extract_amenities(data: Dict) -> Dict[str, Set[str]]:
-    """Extract cabin amenities from YAML data."""
-    cabin_amenities = {}
-    
-    if 'Cabin amenities' in data:
-        amenities_section = data['Cabin amenities']
-        if isinstance(amenities_section, dict):
-            for cabin, amenities_list in amenities_section.items():
-                if amenities_list is None:
-                    cabin_amenities[cabin] = set()
-                elif isinstance(amenities_list, list):
-                    # Remove duplicates by converting to set
-                    cabin_amenities[cabin] = set(amenities_list)
-                else:
-                    cabin_amenities[cabin] = set()
-    
-    return cabin_amenities
-
-def get_all_amenities(cabin_amenities: Dict[str, Set[str]]) -> List[str]:
-    """Get sorted list of all unique amenities."""
-    all_amenities = set()
-    for amenities in cabin_amenities.values():
-        all_amenities.update(amenities)
-    return sorted(all_amenities)
-
-def extract_weekend_averages(data: Dict) -> Dict[str, float]:
-    """Extract weekend average prices from YAML data."""
-    weekend_averages = {}
-    
-    for key, value in data.items():
-        if key.startswith('Average price for '):
-            # Extract weekend name from "Average price for June Weekend 1"
-            weekend_name = key.replace('Average price for ', '')
-            if isinstance(value, str) and value.startswith('$'):
-                try:
-                    price = float(value.replace('$', '').replace(',', ''))
-                    weekend_averages[weekend_name] = price
-                except ValueError:
-                    continue
-    
-    return weekend_averages
+    def close(self, rejected: List[str] = ()):
+        """Write the summary, amenities and rejected cabins sections."""
+        priced = [(name, avg) for name, avg in self.averages.items() if avg is not None]
+        if priced:
+            cheapest_name, cheapest_price = min(priced, key=lambda x: x[1])
+            self._line(f"\nLeast Expensive Weekend: {cheapest_name}\nAverage Price: ${cheapest_price:.2f}")
+        else:
+            self._line("\nNo weekends have available cabins.")
+
+        self._line(f"\nCabin amenities:")
+        for name, amenities in self.amenities.items():
+            self._line(f"  {name}:")
+            for amenity in amenities:
+                self._line(f"    - {amenity}")
+
+        if len(rejected) > 0:
+            self._line("\nRejected cabins:")
+            for cabin_name in rejected:
+                self._line(f"  - {cabin_name}")
+
+def generate_yaml_report(model: ReportModel) -> str:
+    """Generate the YAML text report from the report model."""
+    output = io.StringIO()
+    writer = YamlReportWriter(output)
+    for weekend in model.weekends:
+        writer.write_weekend(weekend.name, [(model.cabins[cell.cabin], cell) for cell in weekend.cells], weekend.average)
+    writer.close(model.rejected)
+    return output.getvalue()
 
 def get_orange_saturation(price: float, min_price: float, max_price: float) -> str:
     """Calculate orange color saturation based on price relative to min/max range."""
@@ -172,7 +109,7 @@ def get_orange_saturation(price: float, min_price: float, max_price: float) -> s
     return f"rgba(255, 152, 0, {saturation:.2f})"
 
 def sort_weekends(weekends: List[str]) -> List[str]:
-    """Sort weekends by month order, then by weekend number."""
+    """Sort weekends by year (when the name has one), month order, then weekend number."""
     month_order = {
         'January': 1, 'February': 2, 'March': 3, 'April': 4,
         'May': 5, 'June': 6, 'July': 7, 'August': 8,
@@ -181,29 +118,15 @@ def sort_weekends(weekends: List[str]) -> List[str]:
     
     def weekend_sort_key(weekend_str):
         parts = weekend_str.split()
-        month = parts[0]
-        weekend_num = int(parts[2]) if len(parts) >= 3 and parts[2].isdigit() else 0
-        return (month_order.get(month, 99), weekend_num)
+        month = parts[0] if parts else ""
+        # "July Weekend 3", or "June 2027 Weekend 2" from cabin_search.weekend_windows
+        year = int(parts[1]) if len(parts) >= 2 and parts[1].isdigit() else 0
+        weekend_num = int(parts[-1]) if len(parts) >= 3 and parts[-1].isdigit() else 0
+        return (year, month_order.get(month, 99), weekend_num)
     
     return sorted(weekends, key=weekend_sort_key)
 
-def generate_html_table(cabin_data: Dict[str, Dict[str, Dict]], cabin_amenities: Dict[str, Set[str]], data: Dict, months_to_include: Set[str] = None) -> str:
-    """Generate HTML table with highlighted best prices, hyperlinked cabin names, and amenity columns."""
-    
-    # Get all weekends (columns) and sort them
-    all_weekends = set(
-        weekend for cabin_info in cabin_data.values() 
-        for weekend in cabin_info['prices'].keys()
-    )
-    all_weekends = sort_weekends(list(all_weekends))
-    
-    # Get all cabins (rows)
-    all_cabins = sorted(cabin_data.keys())
-    
-    # Get all amenities (columns)
-    all_amenities = get_all_amenities(cabin_amenities)
-    
-    html = """<!DOCTYPE html>
+HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <style>
@@ -279,171 +202,257 @@ def generate_html_table(cabin_data: Dict[str, Dict[str, Dict]], cabin_amenities:
 <body>
     <h1>Cabin Pricing Report</h1>
 """
+
+def generate_html_table(model: ReportModel, months_to_include: Set[str] = None, row_cache: "RowFragmentCache" = None) -> str:
+    """Generate HTML table with highlighted best prices, hyperlinked cabin names, and amenity columns.
+
+    With a row cache, rows whose data and columns are unchanged since an earlier
+    render are reused instead of rendered again.
+    """
+    
+    # Only price cells for the included months contribute columns and rows
+    def included(weekend_name: str) -> bool:
+        return not months_to_include or weekend_name.split()[0] in months_to_include
+
+    rows = []
+    for row in model.cabins.values():
+        cells = [cell for cell in row.prices.values() if included(cell.weekend)]
+        if cells:
+            rows.append((row, cells))
+    rows.sort(key=lambda r: r[0].name)
+
+    # Get all weekends (columns) and sort them
+    all_weekends = sort_weekends(list({cell.weekend for _, cells in rows for cell in cells}))
+    # cells arrive in pipeline order, which varies between runs; put them in column
+    # order so a row's cache key (and its averages) only change when its data does
+    column = {weekend: i for i, weekend in enumerate(all_weekends)}
+    for _, cells in rows:
+        cells.sort(key=lambda cell: column[cell.weekend])
+    
+    # Get all amenities (columns)
+    all_amenities = model.all_amenities()
+    
+    html = [HTML_HEAD]
     
     if months_to_include:
-        html += f"    <p>Showing data for: {', '.join(months_to_include)}</p>\n"
-    html += "    <p>Weekend = Friday night to Monday morning</p>"
-    html += "    <p>All cabins here incldue a gas grill, Wi-Fi, central air conditioning, and an outdoor firepit.</p>"
-    html += "    <p>CARC = Community Aquatic Recreation Center (aka pool)</p>"
+        html.append(f"    <p>Showing data for: {', '.join(months_to_include)}</p>\n")
+    html.append("    <p>Weekend = Friday night to Monday morning</p>")
+    html.append("    <p>All cabins here incldue a gas grill, Wi-Fi, central air conditioning, and an outdoor firepit.</p>")
+    html.append("    <p>CARC = Community Aquatic Recreation Center (aka pool)</p>")
     
-    html += """    <table>
+    html.append("""    <table>
         <thead>
             <tr>
                 <th>Cabin</th>
-"""
+""")
     
     # Add amenity column headers right after Cabin
     for amenity in all_amenities:
-        html += f"                <th class='amenity-header'>{amenity}</th>\n"
+        html.append(f"                <th class='amenity-header'>{amenity}</th>\n")
     
     # Add bed column headers
-    html += "                <th class='bed-header'>Upper Beds</th>\n"
-    html += "                <th class='bed-header'>Main Beds</th>\n"
-    html += "                <th class='bed-header'>Lower Beds</th>\n"
-    html += "                <th class='bed-header'>Garage Beds</th>\n"
-    html += "                <th class='bed-header'>Total Beds</th>\n"
-    html += "                <th class='bed-header'>Occupancy</th>\n"
+    html.append("                <th class='bed-header'>Upper Beds</th>\n")
+    html.append("                <th class='bed-header'>Main Beds</th>\n")
+    html.append("                <th class='bed-header'>Lower Beds</th>\n")
+    html.append("                <th class='bed-header'>Garage Beds</th>\n")
+    html.append("                <th class='bed-header'>Total Beds</th>\n")
+    html.append("                <th class='bed-header'>Occupancy</th>\n")
     
     for weekend in all_weekends:
-        html += f"                <th>{weekend}</th>\n"
+        html.append(f"                <th>{weekend}</th>\n")
     
-    html += """                <th>Average Price</th>
+    html.append("""                <th>Average Price</th>
                 <th>Score</th>
             </tr>
         </thead>
         <tbody>
-"""
+""")
     
-    for cabin in all_cabins:
-        html += "            <tr>\n"
-        
-        # Create hyperlinked cabin name
-        cabin_url = cabin_data[cabin].get('url', '')
-        if cabin_url:
-            html += f"                <td class='cabin-name'><a href='{cabin_url}' target='_blank'>{cabin}</a></td>\n"
-        else:
-            html += f"                <td class='cabin-name'>{cabin}</td>\n"
-        
-        # Add amenity cells right after cabin name
-        cabin_amenity_set = cabin_amenities.get(cabin, set())
-        for amenity in all_amenities:
-            if amenity in cabin_amenity_set:
-                html += f"                <td class='has-amenity'>✓</td>\n"
-            else:
-                html += f"                <td class='no-amenity'>—</td>\n"
-        
-        # Add bed information cells
-        upper_beds = cabin_data[cabin].get('upper_beds', 0)
-        main_beds = cabin_data[cabin].get('main_beds', 0)
-        lower_beds = cabin_data[cabin].get('lower_beds', 0)
-        garage_beds = cabin_data[cabin].get('garage_beds', 0)
-        total_beds = upper_beds + main_beds + lower_beds + garage_beds
-        occupancy = cabin_data[cabin].get('occupancy', 0)
-        
-        html += f"                <td class='bed-info'>{upper_beds}</td>\n"
-        html += f"                <td class='bed-info'>{main_beds}</td>\n"
-        html += f"                <td class='bed-info'>{lower_beds}</td>\n"
-        html += f"                <td class='bed-info'>{garage_beds if garage_beds > 0 else '—'}</td>\n"
-        html += f"                <td class='bed-info'><strong>{total_beds}</strong></td>\n"
-        html += f"                <td class='bed-info'><strong>{occupancy}</strong></td>\n"
-        
-        # Find minimum price for this cabin
-        prices = list(cabin_data[cabin]['prices'].values())
-        min_price = min(prices) if prices else None
-        avg_price = statistics.mean(prices) if prices else 0
-        
-        # Calculate average score for this cabin
-        scores = list(cabin_data[cabin]['scores'].values())
-        avg_score = statistics.mean(scores) if scores else 0
-        
-        for weekend in all_weekends:
-            if weekend in cabin_data[cabin]['prices']:
-                price = cabin_data[cabin]['prices'][weekend]
-                is_best = (price == min_price)
-                price_class = "best-price" if is_best else "available"
-                html += f"                <td class='{price_class}'>${price:,.2f}</td>\n"
-            else:
-                html += "                <td class='unavailable'>—</td>\n"
-        
-        html += f"                <td><strong>${avg_price:,.2f}</strong></td>\n"
-        html += f"                <td><strong>{avg_score:,.0f}</strong></td>\n"
-        html += "            </tr>\n"
-    
-    # Get weekend averages from YAML data
-    weekend_averages_data = extract_weekend_averages(data)
+    if row_cache is not None:
+        columns = row_cache.columns_key(all_amenities, all_weekends)
+        for row, cells in rows:
+            html.append(row_cache.render(row, cells, all_amenities, all_weekends, columns))
+    else:
+        for row, cells in rows:
+            html.append(render_row(row, cells, all_amenities, all_weekends))
     
     # Add weekend averages row if we have data
-    if weekend_averages_data:
-        html += "            <tr class='average-row'>\n"
-        html += "                <td class='cabin-name'>Weekend Average</td>\n"
-        
-        # Add empty cells for amenity columns
-        for amenity in all_amenities:
-            html += "                <td>—</td>\n"
+    weekend_averages = {w.name: w.average for w in model.weekends if w.average is not None}
+    if weekend_averages:
+        html.append("            <tr class='average-row'>\n")
+        html.append("                <td class='cabin-name'>Weekend Average</td>\n")
         
-        # Add empty cells for bed columns
-        html += "                <td>—</td>\n"  # Upper Beds
-        html += "                <td>—</td>\n"  # Main Beds
-        html += "                <td>—</td>\n"  # Lower Beds
-        html += "                <td>—</td>\n"  # Garage Beds
-        html += "                <td>—</td>\n"  # Total Beds
-        html += "                <td>—</td>\n"  # Occupancy
+        # Add empty cells for amenity and bed columns
+        html.append("                <td>—</td>\n" * (len(all_amenities) + 6))
         
         # Get price range for color saturation
-        available_prices = [weekend_averages_data.get(weekend, 0) for weekend in all_weekends if weekend in weekend_averages_data]
+        available_prices = [weekend_averages[weekend] for weekend in all_weekends if weekend in weekend_averages]
         min_price = min(available_prices) if available_prices else 0
         max_price = max(available_prices) if available_prices else 0
         
         # Add weekend average prices with dynamic coloring
         for weekend in all_weekends:
-            if weekend in weekend_averages_data:
-                avg_price = weekend_averages_data[weekend]
+            if weekend in weekend_averages:
+                avg_price = weekend_averages[weekend]
                 color = get_orange_saturation(avg_price, min_price, max_price)
-                html += f"                <td style='background-color: {color}; color: white; font-weight: bold;'>${avg_price:,.2f}</td>\n"
+                html.append(f"                <td style='background-color: {color}; color: white; font-weight: bold;'>${avg_price:,.2f}</td>\n")
             else:
-                html += "                <td class='unavailable'>—</td>\n"
+                html.append("                <td class='unavailable'>—</td>\n")
         
         # Leave final columns blank as requested
-        html += "                <td>—</td>\n"  # Average Price
-        html += "                <td>—</td>\n"  # Average Score
-        html += "            </tr>\n"
+        html.append("                <td>—</td>\n")  # Average Price
+        html.append("                <td>—</td>\n")  # Average Score
+        html.append("            </tr>\n")
     
-    html += """        </tbody>
+    html.append("""        </tbody>
     </table>
 </body>
 </html>
-"""
+""")
+    
+    return "".join(html)
+
+def render_row(row: CabinRow, cells: List[PriceCell], all_amenities: List[str], all_weekends: List[str]) -> str:
+    """Render a single cabin's table row from its price cells for the included weekends."""
+    html = ["            <tr>\n"]
+    
+    # Create hyperlinked cabin name
+    if row.url:
+        html.append(f"                <td class='cabin-name'><a href='{row.url}' target='_blank'>{row.name}</a></td>\n")
+    else:
+        html.append(f"                <td class='cabin-name'>{row.name}</td>\n")
+    
+    # Add amenity cells right after cabin name
+    cabin_amenity_set = set(row.amenities)
+    for amenity in all_amenities:
+        if amenity in cabin_amenity_set:
+            html.append("                <td class='has-amenity'>✓</td>\n")
+        else:
+            html.append("                <td class='no-amenity'>—</td>\n")
+    
+    # Add bed information cells
+    html.append(f"                <td class='bed-info'>{row.up_beds}</td>\n")
+    html.append(f"                <td class='bed-info'>{row.main_beds}</td>\n")
+    html.append(f"                <td class='bed-info'>{row.low_beds}</td>\n")
+    html.append(f"                <td class='bed-info'>{row.gar_beds if row.gar_beds > 0 else '—'}</td>\n")
+    html.append(f"                <td class='bed-info'><strong>{row.total_beds}</strong></td>\n")
+    html.append(f"                <td class='bed-info'><strong>{row.occupancy}</strong></td>\n")
     
-    return html
+    # Find minimum price for this cabin
+    min_price = min(cell.price for cell in cells)
+    prices_by_weekend = {cell.weekend: cell.price for cell in cells}
+    
+    for weekend in all_weekends:
+        price = prices_by_weekend.get(weekend)
+        if price is not None:
+            price_class = "best-price" if price == min_price else "available"
+            html.append(f"                <td class='{price_class}'>${price:,.2f}</td>\n")
+        else:
+            html.append("                <td class='unavailable'>—</td>\n")
+    
+    html.append(f"                <td><strong>${average_price(cells):,.2f}</strong></td>\n")
+    html.append(f"                <td><strong>{average_score(cells):,.0f}</strong></td>\n")
+    html.append("            </tr>\n")
+    return "".join(html)
+
+class RowFragmentCache:
+    """Rendered table rows from earlier reports, keyed by a digest of everything render_row reads.
+
+    Kept on disk next to the HTML report, so regenerating after a small scrape
+    only renders the rows that changed. Rows not used by the latest render are
+    dropped when the cache is saved.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.fragments = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.fragments = json.load(f)
+            except ValueError:
+                # a damaged cache only costs a full render
+                self.fragments = {}
+
+    @staticmethod
+    def columns_key(all_amenities: List[str], all_weekends: List[str]) -> bytes:
+        return hashlib.blake2b("\x1f".join(all_amenities + ["\x1e"] + all_weekends).encode(), digest_size=16).digest()
+
+    def key(self, row: CabinRow, cells: List[PriceCell], columns: bytes) -> str:
+        # packed rather than repr'd: formatting thousands of floats would cost more than rendering the row
+        digest = hashlib.blake2b(columns, digest_size=16)
+        digest.update("\x1f".join([row.name, row.url, *sorted(set(row.amenities)), "\x1e", *[cell.weekend for cell in cells]]).encode())
+        digest.update(struct.pack(f"5q{2 * len(cells)}d", row.up_beds, row.main_beds, row.low_beds, row.gar_beds, row.occupancy,
+                                  *[cell.price for cell in cells], *[cell.score for cell in cells]))
+        return digest.hexdigest()
 
-def format(yaml_data, months_to_include: Set[str] = None) -> str:
+    def render(self, row: CabinRow, cells: List[PriceCell], all_amenities: List[str], all_weekends: List[str], columns: bytes = None) -> str:
+        key = self.key(row, cells, columns or self.columns_key(all_amenities, all_weekends))
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            fragment = render_row(row, cells, all_amenities, all_weekends)
+            self.misses += 1
+        else:
+            self.hits += 1
+        self.used[key] = fragment
+        return fragment
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.used, f)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> str:
+        return f"{self.misses} row(s) rendered, {self.hits} reused"
+
+
+def row_cache_path(html_path: str) -> str:
+    """Where the row cache for an HTML report lives, e.g. cabin-report.rows.json."""
+    stem, dot, _ = html_path.rpartition('.')
+    return f"{stem if dot else html_path}.rows.json"
+
+
+def format(report_data, months_to_include: Set[str] = None, row_cache: RowFragmentCache = None) -> str:
     """Format the given cabin data into an HTML report.
     
     Args:
-        yaml_data: Either a YAML string or a dict (already parsed)
+        report_data: A ReportModel, a YAML string, or a dict (already parsed YAML)
         months_to_include: Set of month names to include in the report
+        row_cache: Optional cache of rendered rows from earlier reports
         
     Returns:
         HTML string
     """
-    if isinstance(yaml_data, str):
-        data = parse_cabin_data(yaml_data)
+    if isinstance(report_data, ReportModel):
+        model = report_data
+    elif isinstance(report_data, str):
+        model = ReportModel.from_dict(parse_cabin_data(report_data))
     else:
-        # Assume it's already a dict
-        data = yaml_data
+        # Assume it's an already parsed YAML dict
+        model = ReportModel.from_dict(report_data)
     
-    cabin_data = extract_cabin_prices(data, months_to_include)
-    cabin_amenities = extract_amenities(data)
-    html_output = generate_html_table(cabin_data, cabin_amenities, data, months_to_include)
-    return html_output
+    return generate_html_table(model, months_to_include, row_cache)
 
-def main():
+def main(argv: List[str] = None):
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Generate HTML cabin pricing report')
     parser.add_argument('--output', '-o', 
                        default='cabin-report.html',
                        help='Output HTML filename (default: cabin-report.html)')
-    args = parser.parse_args()
+    parser.add_argument('--input', '-i',
+                       default='cabin-report.yml',
+                       help='YAML report to read (default: cabin-report.yml)')
+    parser.add_argument('--paged', action='store_true',
+                       help='write a small HTML shell plus a lazily loaded data file instead of one inline table')
+    parser.add_argument('--split-months', action='store_true',
+                       help='with --paged, write one data file per month')
+    args = parser.parse_args(argv)
     
     # Configuration: specify which months to include (None = all months)
     # Options: "June", "July", "August"
@@ -451,17 +460,26 @@ def main():
     
     # Load and process data
     data = None
-    with open('cabin-report.yml', 'r') as f:
-        data = yaml.safe_load(f)
-    
-    # Generate HTML
-    html_output = format(yaml_data=data, months_to_include=months_to_include)
+    with open(args.input, 'r') as f:
+        data = parse_cabin_data(f.read())
+    
+    if args.paged:
+        import report_paged
+        model = ReportModel.from_dict(data)
+        for path in report_paged.write_paged_report(model, args.output, months_to_include, args.split_months):
+            print(f"Wrote {path}")
+        return
+
+    # Generate HTML, reusing the rows that have not changed since the last report
+    row_cache = RowFragmentCache(row_cache_path(args.output))
+    html_output = format(report_data=data, months_to_include=months_to_include, row_cache=row_cache)
     
     # Save to file
     with open(args.output, 'w') as f:
         f.write(html_output)
+    row_cache.save()
     
-    print(f"HTML report generated: {args.output}")
+    print(f"HTML report generated: {args.output} ({row_cache.stats()})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
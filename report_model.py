@@ -0,0 +1,167 @@
+#report_model.py
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Iterable
+
+
+def parse_price(value) -> Optional[float]:
+    """Parse a "$1,682.96" style price string from a YAML report."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.startswith('$'):
+        try:
+            return float(value.replace('$', '').replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass
+class PriceCell:
+    cabin: str
+    weekend: str
+    price: float
+    score: int
+
+
+@dataclass
+class CabinRow:
+    name: str
+    url: str
+    occupancy: int
+    up_beds: int
+    main_beds: int
+    low_beds: int
+    gar_beds: int
+    # optional amenities in the order they were found (may repeat, as in the YAML report)
+    amenities: List[str] = field(default_factory=list)
+    prices: Dict[str, PriceCell] = field(default_factory=dict)
+
+    @property
+    def total_beds(self) -> int:
+        return self.up_beds + self.main_beds + self.low_beds + self.gar_beds
+
+
+@dataclass
+class Weekend:
+    name: str
+    cells: List[PriceCell] = field(default_factory=list)
+    average: Optional[float] = None
+
+    @property
+    def month(self) -> str:
+        return self.name.split()[0] if self.name else ""
+
+
+@dataclass
+class ReportModel:
+    weekends: List[Weekend] = field(default_factory=list)
+    cabins: Dict[str, CabinRow] = field(default_factory=dict)
+    rejected: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_cabins(cls, cabin_prices_by_weekend: Dict, average_prices: Dict, required_amenities: Iterable[str] = (), rejected: Iterable[str] = ()) -> "ReportModel":
+        """Build the report model directly from KeyCabin lists keyed by weekend name."""
+        required = set(required_amenities)
+        model = cls(rejected=list(rejected))
+        for weekend_name, cabins in cabin_prices_by_weekend.items():
+            weekend = model.add_weekend(weekend_name)
+            for cabin in cabins:
+                model.add_cabin(weekend, cabin, required)
+            weekend.average = average_prices.get(weekend_name)
+        return model
+
+    def add_weekend(self, weekend_name: str) -> "Weekend":
+        weekend = Weekend(name=weekend_name)
+        self.weekends.append(weekend)
+        return weekend
+
+    def add_cabin(self, weekend: "Weekend", cabin, required_amenities: set) -> PriceCell:
+        """Add one KeyCabin's price for a weekend, so the model can be built as cabins arrive."""
+        # the latest weekend's details win, matching the old all_cabins_dict behaviour
+        row = CabinRow(
+            name=cabin.name,
+            url=cabin.url,
+            occupancy=cabin.occupancy,
+            up_beds=cabin.up_beds,
+            main_beds=cabin.main_beds,
+            low_beds=cabin.low_beds,
+            gar_beds=cabin.gar_beds,
+            amenities=[a for a in cabin.amenities if a not in required_amenities],
+        )
+        existing = self.cabins.get(cabin.name)
+        if existing is not None:
+            row.prices = existing.prices
+        self.cabins[cabin.name] = row
+        cell = PriceCell(cabin=cabin.name, weekend=weekend.name, price=cabin.price, score=cabin.get_score())
+        row.prices[weekend.name] = cell
+        weekend.cells.append(cell)
+        return cell
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "ReportModel":
+        """Build the report model from a parsed YAML report."""
+        model = cls()
+        weekends_by_name = {}
+        for key, value in d.items():
+            if key.startswith('Cabin prices for '):
+                weekend = Weekend(name=key[len('Cabin prices for '):])
+                weekends_by_name[weekend.name] = weekend
+                model.weekends.append(weekend)
+                if not isinstance(value, dict):
+                    continue
+                for cabin_name, info in value.items():
+                    if not isinstance(info, dict):
+                        continue
+                    price = parse_price(info.get('Price'))
+                    if price is None:
+                        continue
+                    row = model.cabins.get(cabin_name)
+                    if row is None:
+                        row = CabinRow(
+                            name=cabin_name,
+                            url=info.get('URL', ''),
+                            occupancy=info.get('Occupancy', 0),
+                            up_beds=info.get('Upper Beds', 0),
+                            main_beds=info.get('Main Beds', 0),
+                            low_beds=info.get('Lower Beds', 0),
+                            gar_beds=info.get('Garage Beds', 0),
+                        )
+                        model.cabins[cabin_name] = row
+                    elif not row.url:
+                        row.url = info.get('URL', '')
+                    cell = PriceCell(cabin=cabin_name, weekend=weekend.name, price=price, score=info.get('Score', 0))
+                    row.prices[weekend.name] = cell
+                    weekend.cells.append(cell)
+            elif key.startswith('Average price for '):
+                name = key[len('Average price for '):]
+                weekend = weekends_by_name.get(name)
+                if weekend is not None:
+                    weekend.average = parse_price(value)
+            elif key == 'Cabin amenities' and isinstance(value, dict):
+                for cabin_name, amenities in value.items():
+                    row = model.cabins.get(cabin_name)
+                    if row is None:
+                        # cabins only listed under amenities still contribute amenity columns
+                        row = CabinRow(name=cabin_name, url='', occupancy=0, up_beds=0, main_beds=0, low_beds=0, gar_beds=0)
+                        model.cabins[cabin_name] = row
+                    row.amenities = list(amenities) if isinstance(amenities, list) else []
+            elif key == 'Rejected cabins' and isinstance(value, list):
+                model.rejected = list(value)
+        return model
+
+    def all_amenities(self) -> List[str]:
+        """Sorted list of all unique optional amenities."""
+        return sorted({a for row in self.cabins.values() for a in row.amenities})
+
+
+# statistics is imported on first use; it noticeably slows report-only startup
+def average_price(cells: Iterable[PriceCell]) -> float:
+    import statistics
+    prices = [cell.price for cell in cells]
+    return statistics.mean(prices) if prices else 0
+
+
+def average_score(cells: Iterable[PriceCell]) -> float:
+    import statistics
+    scores = [cell.score for cell in cells]
+    return statistics.mean(scores) if scores else 0
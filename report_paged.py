@@ -0,0 +1,278 @@
+#report_paged.py
+# Paged HTML report: a small HTML shell plus columnar data sidecars that the
+# browser loads on demand and renders with virtual scrolling.
+
+import json
+import os
+from typing import Dict, List, Set, Optional
+from report_model import ReportModel, average_price, average_score
+from report_formatter import sort_weekends, get_orange_saturation
+
+# Sidecars are wrapped in a callback (JSONP style) rather than fetched, so the
+# report still opens straight from disk where browsers block fetch() of file:// URLs
+DATA_CALLBACK = "cabinReportLoaded"
+
+
+def build_columns(model: ReportModel, months_to_include: Optional[Set[str]] = None) -> Dict:
+    """Build the compact columnar payload for the cabins priced in the given months."""
+    def included(weekend_name: str) -> bool:
+        return not months_to_include or weekend_name.split()[0] in months_to_include
+
+    rows = []
+    for row in model.cabins.values():
+        cells = [cell for cell in row.prices.values() if included(cell.weekend)]
+        if cells:
+            rows.append((row, cells))
+    rows.sort(key=lambda r: r[0].name)
+
+    weekends = sort_weekends(list({cell.weekend for _, cells in rows for cell in cells}))
+    weekend_index = {weekend: i for i, weekend in enumerate(weekends)}
+    averages_by_name = {w.name: w.average for w in model.weekends}
+    amenities = model.all_amenities()
+    amenity_index = {amenity: i for i, amenity in enumerate(amenities)}
+
+    columns = {
+        "weekends": weekends,
+        "averages": [round(averages_by_name[w], 2) if averages_by_name.get(w) is not None else None for w in weekends],
+        "amenities": amenities,
+        "name": [], "url": [], "amen": [],
+        "up": [], "main": [], "low": [], "gar": [], "occ": [],
+        "prices": [], "avg": [], "score": [],
+    }
+    for row, cells in rows:
+        prices = [None] * len(weekends)
+        for cell in cells:
+            prices[weekend_index[cell.weekend]] = round(cell.price, 2)
+        # one "0"/"1" character per amenity column: JS bit operations are 32-bit and
+        # JSON numbers lose precision past 2^53, so an integer mask would break with many amenities
+        flags = ["0"] * len(amenities)
+        for amenity in row.amenities:
+            flags[amenity_index[amenity]] = "1"
+        columns["name"].append(row.name)
+        columns["url"].append(row.url)
+        columns["amen"].append("".join(flags))
+        columns["up"].append(row.up_beds)
+        columns["main"].append(row.main_beds)
+        columns["low"].append(row.low_beds)
+        columns["gar"].append(row.gar_beds)
+        columns["occ"].append(row.occupancy)
+        columns["prices"].append(prices)
+        columns["avg"].append(round(average_price(cells), 2))
+        columns["score"].append(round(average_score(cells)))
+
+    # weekend average colours are cheap to precompute and keep the client simple
+    available = [a for a in columns["averages"] if a is not None]
+    low, high = (min(available), max(available)) if available else (0, 0)
+    columns["avgColors"] = [get_orange_saturation(a, low, high) if a is not None else None for a in columns["averages"]]
+    return columns
+
+
+def _month_number(month: str) -> int:
+    names = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+             'August', 'September', 'October', 'November', 'December']
+    return names.index(month) if month in names else 99
+
+
+def data_file_name(html_path: str, key: Optional[str] = None) -> str:
+    base, _ = os.path.splitext(html_path)
+    return f"{base}.{key}.data.js" if key else f"{base}.data.js"
+
+
+def write_paged_report(model: ReportModel, html_path: str, months_to_include: Optional[Set[str]] = None, split_months: bool = False) -> List[str]:
+    """Write the HTML shell and its data sidecars. Returns the paths written.
+
+    With split_months each month gets its own sidecar, which is only loaded
+    when that month is selected in the page.
+    """
+    months = []
+    for weekend in model.weekends:
+        if weekend.cells and weekend.month not in months and (not months_to_include or weekend.month in months_to_include):
+            months.append(weekend.month)
+    months.sort(key=_month_number)
+
+    if split_months and months:
+        groups = {month: {month} for month in months}
+    else:
+        groups = {"all": months_to_include}
+
+    written = []
+    files = {}
+    for key, group_months in groups.items():
+        path = data_file_name(html_path, None if key == "all" else key)
+        payload = json.dumps(build_columns(model, group_months), separators=(',', ':'))
+        with open(path, 'w') as f:
+            f.write(f"{DATA_CALLBACK}({json.dumps(key)},{payload});\n")
+        files[key] = os.path.basename(path)
+        written.append(path)
+
+    with open(html_path, 'w') as f:
+        f.write(generate_html_shell(files, months_to_include))
+    written.append(html_path)
+    return written
+
+
+def generate_html_shell(files: Dict[str, str], months_to_include: Optional[Set[str]] = None) -> str:
+    """Generate the HTML shell that lazily loads the data sidecars."""
+    shown = ', '.join(sorted(months_to_include, key=_month_number)) if months_to_include else "all months"
+    return (HTML_SHELL
+            .replace("__SHOWN__", shown)
+            .replace("__FILES__", json.dumps(files))
+            .replace("__CALLBACK__", DATA_CALLBACK))
+
+
+HTML_SHELL = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; }
+        #viewport { height: 75vh; overflow: auto; margin: 20px; }
+        table { border-collapse: collapse; }
+        th, td { border: 1px solid #ddd; padding: 0 8px; height: 32px; text-align: center; white-space: nowrap; }
+        th { background-color: #4CAF50; color: white; position: sticky; top: 0; cursor: pointer; }
+        tfoot td { position: sticky; bottom: 0; background-color: #FFF3E0; font-weight: bold; }
+        .cabin-name { font-weight: bold; text-align: left; background-color: #f2f2f2; }
+        .cabin-name a { color: #2c5aa0; text-decoration: none; }
+        .cabin-name a:hover { text-decoration: underline; }
+        .best-price { background-color: #00C853; color: white; font-weight: bold; }
+        .available { background-color: #C8E6C9; }
+        .unavailable { background-color: #ffebee; color: #999; }
+        th.amenity-header { background-color: #2196F3; }
+        .has-amenity { background-color: #E3F2FD; font-weight: bold; }
+        .no-amenity { background-color: #f5f5f5; color: #ccc; }
+        th.bed-header { background-color: #9C27B0; }
+        .bed-info { background-color: #F3E5F5; }
+    </style>
+</head>
+<body>
+    <h1>Cabin Pricing Report</h1>
+    <p>Showing data for: __SHOWN__</p>
+    <p>Weekend = Friday night to Monday morning</p>
+    <p>All cabins here incldue a gas grill, Wi-Fi, central air conditioning, and an outdoor firepit.</p>
+    <p>CARC = Community Aquatic Recreation Center (aka pool)</p>
+    <p id="pages"></p>
+    <div id="viewport">
+        <table>
+            <thead><tr id="header"></tr></thead>
+            <tbody id="rows"><tr><td>Loading...</td></tr></tbody>
+            <tfoot><tr id="averages"></tr></tfoot>
+        </table>
+    </div>
+    <script>
+    const FILES = __FILES__;
+    const ROW_HEIGHT = 33;
+    const OVERSCAN = 10;
+    const cache = {};
+    let current = null, data = null, order = [], sortKey = null, sortDesc = false;
+
+    window.__CALLBACK__ = function (key, payload) {
+        cache[key] = payload;
+        if (key === current) show(payload);
+    };
+
+    function load(key) {
+        current = key;
+        if (cache[key]) { show(cache[key]); return; }
+        const script = document.createElement('script');
+        script.src = FILES[key];
+        document.head.appendChild(script);
+    }
+
+    function esc(s) {
+        return String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/'/g, '&#39;');
+    }
+
+    function money(p) {
+        return '$' + p.toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+    }
+
+    function columns(d) {
+        const cols = [{label: 'Cabin', key: i => d.name[i].toLowerCase()}];
+        d.amenities.forEach((a, j) => cols.push({label: a, cls: 'amenity-header', key: i => d.amen[i][j] === '1' ? 1 : 0}));
+        cols.push({label: 'Upper Beds', cls: 'bed-header', key: i => d.up[i]});
+        cols.push({label: 'Main Beds', cls: 'bed-header', key: i => d.main[i]});
+        cols.push({label: 'Lower Beds', cls: 'bed-header', key: i => d.low[i]});
+        cols.push({label: 'Garage Beds', cls: 'bed-header', key: i => d.gar[i]});
+        cols.push({label: 'Total Beds', cls: 'bed-header', key: i => d.up[i] + d.main[i] + d.low[i] + d.gar[i]});
+        cols.push({label: 'Occupancy', cls: 'bed-header', key: i => d.occ[i]});
+        d.weekends.forEach((w, j) => cols.push({label: w, key: i => d.prices[i][j] === null ? Infinity : d.prices[i][j]}));
+        cols.push({label: 'Average Price', key: i => d.avg[i]});
+        cols.push({label: 'Score', key: i => d.score[i]});
+        return cols;
+    }
+
+    function show(d) {
+        data = d;
+        data.cols = columns(d);
+        order = d.name.map((_, i) => i);
+        sortKey = null;
+        document.getElementById('header').innerHTML = data.cols.map((c, j) =>
+            `<th data-col="${j}"${c.cls ? ` class="${c.cls}"` : ''}>${esc(c.label)}</th>`).join('');
+        const blanks = '<td>—</td>'.repeat(d.amenities.length + 6);
+        document.getElementById('averages').innerHTML = '<td class="cabin-name">Weekend Average</td>' + blanks +
+            d.averages.map((a, j) => a === null ? '<td class="unavailable">—</td>' :
+                `<td style="background-color: ${d.avgColors[j]}; color: white;">${money(a)}</td>`).join('') +
+            '<td>—</td><td>—</td>';
+        document.getElementById('viewport').scrollTop = 0;
+        renderRows();
+    }
+
+    function rowHtml(i) {
+        const d = data;
+        let html = d.url[i] ? `<td class="cabin-name"><a href="${esc(d.url[i])}" target="_blank">${esc(d.name[i])}</a></td>`
+                            : `<td class="cabin-name">${esc(d.name[i])}</td>`;
+        for (let j = 0; j < d.amenities.length; j++) {
+            html += d.amen[i][j] === '1' ? '<td class="has-amenity">✓</td>' : '<td class="no-amenity">—</td>';
+        }
+        html += `<td class="bed-info">${d.up[i]}</td><td class="bed-info">${d.main[i]}</td><td class="bed-info">${d.low[i]}</td>`;
+        html += `<td class="bed-info">${d.gar[i] > 0 ? d.gar[i] : '—'}</td>`;
+        html += `<td class="bed-info"><strong>${d.up[i] + d.main[i] + d.low[i] + d.gar[i]}</strong></td>`;
+        html += `<td class="bed-info"><strong>${d.occ[i]}</strong></td>`;
+        const prices = d.prices[i];
+        const min = Math.min(...prices.filter(p => p !== null));
+        for (const p of prices) {
+            html += p === null ? '<td class="unavailable">—</td>' : `<td class="${p === min ? 'best-price' : 'available'}">${money(p)}</td>`;
+        }
+        html += `<td><strong>${money(d.avg[i])}</strong></td><td><strong>${d.score[i].toLocaleString('en-US')}</strong></td>`;
+        return '<tr>' + html + '</tr>';
+    }
+
+    function renderRows() {
+        if (!data) return;
+        const viewport = document.getElementById('viewport');
+        const start = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        const end = Math.min(order.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+        const span = data.cols.length;
+        let html = `<tr style="height: ${start * ROW_HEIGHT}px"><td colspan="${span}" style="padding: 0; border: 0; height: auto"></td></tr>`;
+        for (let k = start; k < end; k++) html += rowHtml(order[k]);
+        html += `<tr style="height: ${(order.length - end) * ROW_HEIGHT}px"><td colspan="${span}" style="padding: 0; border: 0; height: auto"></td></tr>`;
+        document.getElementById('rows').innerHTML = html;
+    }
+
+    document.getElementById('viewport').addEventListener('scroll', () => requestAnimationFrame(renderRows));
+
+    document.getElementById('header').addEventListener('click', e => {
+        const th = e.target.closest('th');
+        if (!th || !data) return;
+        const col = Number(th.dataset.col);
+        sortDesc = sortKey === col ? !sortDesc : false;
+        sortKey = col;
+        const key = data.cols[col].key;
+        const values = data.name.map((_, i) => key(i));
+        order.sort((a, b) => (values[a] < values[b] ? -1 : values[a] > values[b] ? 1 : 0) * (sortDesc ? -1 : 1));
+        renderRows();
+    });
+
+    const keys = Object.keys(FILES);
+    if (keys.length > 1) {
+        document.getElementById('pages').innerHTML = 'Month: ' + keys.map(k =>
+            `<a href="#" data-key="${esc(k)}">${esc(k)}</a>`).join(' | ');
+        document.getElementById('pages').addEventListener('click', e => {
+            if (e.target.dataset.key) { e.preventDefault(); load(e.target.dataset.key); }
+        });
+    }
+    load(keys[0]);
+    </script>
+</body>
+</html>
+"""
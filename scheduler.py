@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+#scheduler.py
+# Adaptive refresh scheduler for continuous price monitoring. Each weekend
+# window gets a target refresh interval that shrinks as the weekend gets
+# closer and as its prices prove volatile; every tick refreshes the most
+# overdue windows until the request budget for the tick is spent.
+
+import argparse
+import datetime
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+MIN_REFRESH_HOURS = 6        # the nearest, most volatile windows are refreshed this often at most
+MAX_REFRESH_HOURS = 24 * 14  # every window is refreshed at least this often
+VOLATILITY_WEIGHT = 20       # a 5% average price move halves the refresh interval
+VOLATILITY_SMOOTHING = 0.3   # weight of the latest run in the volatility moving average
+
+DEFAULT_STATE_FILE = "refresh-state.json"
+
+
+def window_key(window: tuple) -> str:
+    _, bm, bd, by, em, ed, ey = window
+    return f"{by}-{bm}-{bd}/{ey}-{em}-{ed}"
+
+
+def window_friday(window: tuple) -> datetime.date:
+    _, bm, bd, by, _, _, _ = window
+    return datetime.date(int(by), int(bm), int(bd))
+
+
+def load_state(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {"windows": {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_state(state: Dict, path: str):
+    # write to a temporary file first so an interrupted save never corrupts the history
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def price_change(old_prices: Dict[str, float], new_prices: Dict[str, float]) -> Optional[float]:
+    """Mean relative price move of the cabins priced in both runs, or None if none overlap."""
+    changes = [abs(new_prices[name] - old) / old for name, old in old_prices.items() if name in new_prices and old]
+    if not changes:
+        return None
+    return sum(changes) / len(changes)
+
+
+def target_interval_hours(window: tuple, entry: Dict, today: datetime.date) -> float:
+    """How often a window should be refreshed given its distance and learned volatility."""
+    days_out = max(0, (window_friday(window) - today).days)
+    interval = MIN_REFRESH_HOURS * max(1.0, days_out / 7)
+    interval /= 1 + VOLATILITY_WEIGHT * entry.get("volatility", 0.0)
+    return min(MAX_REFRESH_HOURS, max(MIN_REFRESH_HOURS, interval))
+
+
+def priority(window: tuple, entry: Optional[Dict], now: float, today: datetime.date) -> float:
+    """How overdue a window is: 1.0 means exactly at its target interval."""
+    if not entry or "refreshed" not in entry:
+        # never fetched: ahead of everything, nearest first
+        return float('inf')
+    hours_since = (now - entry["refreshed"]) / 3600
+    return hours_since / target_interval_hours(window, entry, today)
+
+
+def due_windows(windows: List[tuple], state: Dict, now: float, today: datetime.date) -> List[tuple]:
+    """Windows at or past their target interval, most overdue (then nearest) first."""
+    scored = []
+    for window in windows:
+        score = priority(window, state["windows"].get(window_key(window)), now, today)
+        if score >= 1.0:
+            scored.append((-score, window_friday(window), window))
+    scored.sort(key=lambda s: (s[0], s[1]))
+    return [window for _, _, window in scored]
+
+
+def record_refresh(state: Dict, window: tuple, cabins: List, now: float):
+    """Store the window's latest cabins and fold the observed price movement into its volatility."""
+    entry = state["windows"].setdefault(window_key(window), {"name": window[0]})
+    new_prices = {cabin.name: cabin.price for cabin in cabins}
+    change = price_change(entry.get("prices", {}), new_prices)
+    if change is not None:
+        entry["volatility"] = VOLATILITY_SMOOTHING * change + (1 - VOLATILITY_SMOOTHING) * entry.get("volatility", 0.0)
+    entry["prices"] = new_prices
+    entry["cabins"] = [cabin.to_dict() for cabin in cabins]
+    entry["refreshed"] = now
+
+
+def run_tick(windows: List[tuple], state: Dict, budget: int) -> List[tuple]:
+    """Refresh due windows until the tick's request budget is spent. Returns the refreshed windows."""
+    import scrape
+    from cabin_search import passes_filters
+
+    now = time.time()
+    today = datetime.date.today()
+    refreshed = []
+    start_requests = scrape.get_request_count()
+    for window in due_windows(windows, state, now, today):
+        name, bm, bd, by, em, ed, ey = window
+        if scrape.get_request_count() - start_requests + 1 > budget:
+            # every window needs at least its search
+            break
+        print(f"Processing {name}...")
+        result = scrape.search(bm, bd, by, em, ed, ey)
+        # the search result shows how many detail pages the window needs
+        missing = scrape.uncached_cabin_names(result)
+        room = budget - (scrape.get_request_count() - start_requests)
+        if len(missing) > room:
+            # fetch the details that fit so later ticks need fewer; the window is refreshed once the rest fit
+            print(f"Deferring {name}: {len(missing)} cabin detail(s) to fetch, room for {room}")
+            fits = set(missing[:room])
+            scrape.process_cabin_list(json.dumps([item for item in json.loads(result) if item["name"] in fits]))
+            break
+        cabins = [cabin for cabin in scrape.process_cabin_list(result) if passes_filters(cabin)]
+        record_refresh(state, window, cabins, time.time())
+        refreshed.append(window)
+    print(f"Refreshed {len(refreshed)} window(s) using {scrape.get_request_count() - start_requests} request(s)")
+    if scrape.search_cache is not None:
+        print(scrape.search_cache.stats())
+    return refreshed
+
+
+def snapshot(windows: List[tuple], state: Dict) -> Dict:
+    """Latest known cabins for each tracked window, keyed by weekend name."""
+    from cabin import KeyCabin
+    cabin_price_list_by_weekend = {}
+    for window in windows:
+        entry = state["windows"].get(window_key(window))
+        if entry and "cabins" in entry:
+            cabin_price_list_by_weekend[window[0]] = [KeyCabin.from_dict(c) for c in entry["cabins"]]
+    return cabin_price_list_by_weekend
+
+
+def prune(state: Dict, windows: List[tuple]):
+    """Forget windows that are no longer tracked (e.g. weekends that have passed)."""
+    keep = {window_key(window) for window in windows}
+    for key in list(state["windows"].keys()):
+        if key not in keep:
+            del state["windows"][key]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Continuously refresh cabin prices, favouring near and volatile weekends')
+    parser.add_argument('--weeks', type=int, default=26,
+                       help='how many upcoming weekends to track (default: 26)')
+    parser.add_argument('--budget', type=int, default=200,
+                       help='maximum HTTP requests per tick (default: 200)')
+    parser.add_argument('--interval', type=float, default=30,
+                       help='minutes between ticks (default: 30)')
+    parser.add_argument('--once', action='store_true',
+                       help='run a single tick and exit (for cron)')
+    parser.add_argument('--state', default=DEFAULT_STATE_FILE,
+                       help=f'refresh history file (default: {DEFAULT_STATE_FILE})')
+    parser.add_argument('--output', '-o',
+                       default='cabin-report.html',
+                       help='filename for the HTML output report (default: cabin-report.html)')
+    args = parser.parse_args(argv)
+
+    from cabin_search import weekend_windows, write_reports
+    import scrape
+    scrape.load_detail_cache()
+
+    while True:
+        today = datetime.date.today()
+        windows = weekend_windows(today, today + datetime.timedelta(weeks=args.weeks))
+        state = load_state(args.state)
+        prune(state, windows)
+        refreshed = run_tick(windows, state, args.budget)
+        save_state(state, args.state)
+        scrape.save_detail_cache()
+        if refreshed:
+            write_reports(snapshot(windows, state), args.output, months_to_include=None)
+        if args.once:
+            break
+        time.sleep(args.interval * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,26 @@
 #scrape.py
+import datetime
+import os
 import threading
+import time
 import requests
 import json
 import copy
 import re
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import quote
 from bs4 import BeautifulSoup
+import detail_parser
 from cabin import KeyCabin, Cabin
-from config import REQUIRED_AMENITIES, OPTIONAL_AMENITIES
+from config import REQUIRED_AMENITIES, OPTIONAL_AMENITIES, SEARCH_CACHE_TTL
+from profiles import profile_amenities
+from search_cache import SearchCache, normalize_key
+from throttle import AdaptiveLimiter, BACKOFF_STATUSES
 
-SEARCH_URL = "https://www.deepcreek.com/rcapi/item/avail/search?rcav%5Bbegin%5D={0}%2F{1}%2F{2}&rcav%5Bend%5D={3}%2F{4}%2F{5}&rcav%5Badult%5D=1&rcav%5Bchild%5D=0&rcav%5Bflex%5D=&rcav%5Bflex_type%5D=d"
+# override with e.g. RAILEY_SITE_URL=http://localhost:8000 to run against standin_server.py
+SITE_URL = os.environ.get("RAILEY_SITE_URL", "https://www.deepcreek.com")
+SEARCH_URL = SITE_URL + "/rcapi/item/avail/search?rcav%5Bbegin%5D={0}%2F{1}%2F{2}&rcav%5Bend%5D={3}%2F{4}%2F{5}&rcav%5Badult%5D={6}&rcav%5Bchild%5D={7}&rcav%5Bflex%5D={8}&rcav%5Bflex_type%5D=d"
 
 BEDS = ".rc-lodging-beds"
 BATHS = ".rc-lodging-baths"
@@ -18,6 +30,24 @@ UPPER_BEDS = "Upper Level: Bedroom"
 MAIN_BEDS = "Main Level: Bedroom"
 LOWER_BEDS = "Lower Level: Bedroom"
 ABOVE_GARAGE_BEDS = "Above Garage: Bedroom"
+BED_LABELS = [UPPER_BEDS, MAIN_BEDS, LOWER_BEDS, ABOVE_GARAGE_BEDS]
+
+# detail page section each KeyCabin field is read from
+FIELD_SECTIONS = {
+    "occupancy": "lodging", "beds": "lodging", "baths": "lodging",
+    "up_beds": "bedrooms", "main_beds": "bedrooms", "low_beds": "bedrooms", "gar_beds": "bedrooms",
+    "amenities": "amenities",
+}
+
+# amenities looked for on detail pages, including any that only a profile in config.PROFILES requires
+DESIRED_AMENITIES = REQUIRED_AMENITIES + OPTIONAL_AMENITIES + profile_amenities()
+
+# cabin details kept between runs, so a run only scrapes cabins it has not seen before
+DETAIL_CACHE_FILE = "detail-cache.json"
+
+# read detail pages incrementally and hang up once the needed sections are parsed
+STREAM_DETAILS = True
+CHUNK_SIZE = 16 * 1024
 
 CABIN_URL_NAMES = {
     "All In": "all",
@@ -35,12 +65,79 @@ CABIN_URL_NAMES = {
     "Tips Up": "tips",
 }
 
+MAX_ATTEMPTS = 4
+
 cabin_key_details_dict = {}
 cabins_needing_url_names = []
+# opened on first search; shared with every other tool run from the same directory
+search_cache = None
+# shared by every search and detail request so in-flight requests adapt to how the site responds
+limiter = AdaptiveLimiter()
 
 def get_cabins_needing_url_names() -> list[str]:
     return cabins_needing_url_names
 
+# number of HTTP requests sent to the site, used by the scheduler's request budget
+def get_request_count() -> int:
+    return limiter.sent
+
+def _get(url: str, stream: bool, kind: str) -> tuple:
+    """GET a url through the shared limiter, retrying when the site asks us to back off.
+
+    Returns the response and when it was sent; its limiter slot is still held.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = requests.get(url, timeout=60, stream=stream)
+        except requests.RequestException as e:
+            limiter.release(time.monotonic() - start, None, kind=kind)
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            print(f"Request to {url} failed ({e}), retrying")
+            continue
+        if response.status_code not in BACKOFF_STATUSES or attempt == MAX_ATTEMPTS - 1:
+            return response, start
+        _release(response, start, response.status_code, kind)
+        response.close()
+        print(f"Request to {url} returned {response.status_code}, retrying")
+
+def _release(response: requests.Response, start: float, status: Optional[int], kind: str):
+    retry_after = response.headers.get("Retry-After")
+    limiter.release(time.monotonic() - start, status,
+                    float(retry_after) if retry_after and retry_after.isdigit() else None, kind)
+
+def fetch(url: str, kind: str = "detail") -> requests.Response:
+    """GET a url through the shared limiter; the whole body has been read when this returns.
+
+    kind ("search" or "detail") keeps the latency baselines of large search
+    responses and small detail pages apart.
+    """
+    response, start = _get(url, False, kind)
+    _release(response, start, response.status_code, kind)
+    return response
+
+@contextmanager
+def fetch_stream(url: str):
+    """GET a url for reading incrementally inside the with block.
+
+    The limiter slot is held until the block exits and the response is closed,
+    so the limiter bounds how many bodies download at once and its latency
+    samples include the time spent reading the body.
+    """
+    response, start = _get(url, True, "detail")
+    status = response.status_code
+    try:
+        yield response
+    except requests.RequestException:
+        # the body was cut off part way; count it like a connection error
+        status = None
+        raise
+    finally:
+        response.close()
+        _release(response, start, status, "detail")
+
 def dash_replace(name: str, phrase: str):
     if phrase in name:
         return name.replace(phrase, "-")
@@ -76,79 +173,209 @@ def name_to_url_name(name: str):
 
     return url_name
 
-def get_key_cabin_details(name: str) -> KeyCabin:
-    name_url = CABIN_URL_NAMES[name] if name in CABIN_URL_NAMES.keys() else name_to_url_name(name)
-    cabin_url = f"https://www.deepcreek.com/vacation-rentals/{name_url}"
-    print(f"Scraping details for cabin: {name} @ {cabin_url}")
-    result = requests.get(cabin_url)
-    soup = BeautifulSoup(result.content, "html.parser")
-
-    # add all amenities here
-    full_amenity_list = REQUIRED_AMENITIES + OPTIONAL_AMENITIES
+def match_amenities(amenity_items: list[list[str]]) -> list[str]:
+    """Names of the desired amenities found, given the text nodes of each amenity list item."""
+    full_amenity_list = DESIRED_AMENITIES
     available_amenity_list = []
 
-    for found_amenity in soup.find_all(name="li", class_="amenity-list-item"):
+    for item_texts in amenity_items:
         for desired_amenity in full_amenity_list:
             for amenity_key in desired_amenity.keys:
-                if found_amenity.find(string=re.compile(re.escape(amenity_key))):
+                if any(amenity_key in text for text in item_texts):
                     available_amenity_list.append(desired_amenity.name)
                     break
-    up_beds = soup.find_all(string=re.compile(UPPER_BEDS))
-    low_beds = soup.find_all(string=re.compile(LOWER_BEDS))
-    main_beds = soup.find_all(string=re.compile(MAIN_BEDS))
-    ab_g_beds = soup.find_all(string=re.compile(ABOVE_GARAGE_BEDS))
-    
+    return available_amenity_list
 
-    beds_text = soup.select_one(BEDS).text.strip() if soup.select_one(BEDS) else "N/A"
+def sections_for(fields=None) -> set:
+    """Detail page sections holding the given KeyCabin fields; None means every field."""
+    if fields is None:
+        return set(detail_parser.SECTIONS)
+    # the lodging counts come first on the page and also tell a missing page apart
+    return {"lodging"} | {FIELD_SECTIONS[field] for field in fields if field in FIELD_SECTIONS}
+
+def needed_fields(fields=None) -> set:
+    """The detail fields among the requested ones; price and name come from the search."""
+    return set(FIELD_SECTIONS) if fields is None else set(fields) & set(FIELD_SECTIONS)
+
+def parse_details_soup(content: bytes, sections=detail_parser.SECTIONS) -> dict:
+    soup = BeautifulSoup(content, "html.parser")
+    lodging_text = {}
+    for field, selector in (("beds", BEDS), ("baths", BATHS), ("occupancy", OCCUPANCY)):
+        element = soup.select_one(selector)
+        if element:
+            lodging_text[field] = element.text.strip()
+    amenity_items = []
+    if "amenities" in sections:
+        amenity_items = [list(item.strings) for item in soup.find_all(name="li", class_="amenity-list-item")]
+    bed_label_counts = {label: 0 for label in BED_LABELS}
+    if "bedrooms" in sections:
+        bed_label_counts = {label: len(soup.find_all(string=re.compile(label))) for label in BED_LABELS}
+    return {"lodging_text": lodging_text, "amenity_items": amenity_items, "bed_label_counts": bed_label_counts}
+
+def parse_details_stream(response: requests.Response, sections=detail_parser.SECTIONS) -> dict:
+    # stop reading once the requested sections are parsed; the rest of the page is reviews, scripts and galleries
+    parser = detail_parser.parse_stream(response.iter_content(chunk_size=CHUNK_SIZE), BED_LABELS, sections)
+    return {"lodging_text": parser.lodging_text, "amenity_items": parser.amenity_items, "bed_label_counts": parser.bed_label_counts}
+
+def get_key_cabin_details(name: str, sections=detail_parser.SECTIONS) -> KeyCabin:
+    """Scrape a cabin's detail page. Fields outside the requested sections are listed in the result's missing set."""
+    sections = set(sections) | {"lodging"}
+    name_url = CABIN_URL_NAMES[name] if name in CABIN_URL_NAMES.keys() else name_to_url_name(name)
+    cabin_url = f"{SITE_URL}/vacation-rentals/{name_url}"
+    print(f"Scraping details for cabin: {name} @ {cabin_url}")
+    if STREAM_DETAILS:
+        with fetch_stream(cabin_url) as response:
+            details = parse_details_stream(response, sections)
+    else:
+        details = parse_details_soup(fetch(cabin_url).content, sections)
+
+    lodging_text = details["lodging_text"]
+    bed_label_counts = details["bed_label_counts"]
+
+    beds_text = lodging_text.get("beds", "N/A")
     beds = ''.join(filter(str.isdigit, beds_text)) if beds_text != "N/A" else "N/A"
-    if beds_text == "N/A":
+    # completing a partial record fetches the page again; list each cabin once
+    if beds_text == "N/A" and name not in cabins_needing_url_names:
         cabins_needing_url_names.append(name)
     
-    baths_text = soup.select_one(BATHS).text.strip() if soup.select_one(BATHS) else "N/A"
+    baths_text = lodging_text.get("baths", "N/A")
     baths = ''.join(filter(str.isdigit, baths_text)) if baths_text != "N/A" else "N/A"
     
-    occupancy_text = soup.select_one(OCCUPANCY).text.strip() if soup.select_one(OCCUPANCY) else "N/A"
+    occupancy_text = lodging_text.get("occupancy", "N/A")
     occupancy = ''.join(filter(str.isdigit, occupancy_text)) if occupancy_text != "N/A" else "N/A"
     
-    return KeyCabin(
+    key_cabin = KeyCabin(
         name=name, 
         occupancy=int(occupancy) if occupancy != "N/A" else 0, 
         beds=int(beds) if beds != "N/A" else 0, 
-        up_beds=len(up_beds),
-        main_beds=len(main_beds),
-        low_beds=len(low_beds),
-        gar_beds=len(ab_g_beds),
+        up_beds=bed_label_counts[UPPER_BEDS],
+        main_beds=bed_label_counts[MAIN_BEDS],
+        low_beds=bed_label_counts[LOWER_BEDS],
+        gar_beds=bed_label_counts[ABOVE_GARAGE_BEDS],
         baths=int(baths) if baths != "N/A" else 0, 
         url=cabin_url,
-        amenities=available_amenity_list
+        # matching every list item against every amenity is the costliest extraction, so only do it when asked
+        amenities=match_amenities(details["amenity_items"]) if "amenities" in sections else []
     )
+    key_cabin.missing = {field for field, section in FIELD_SECTIONS.items() if section not in sections}
+    return key_cabin
 
-def search(bm, bd, by, em, ed, ey):
-    response = requests.get(SEARCH_URL.format(bm, bd, by, em, ed, ey))
+def complete_key_cabin_details(key_cabin: KeyCabin, fields=None):
+    """Fetch only the page sections holding a partial record's missing fields (or those of them in fields), and fill them in."""
+    wanted = key_cabin.missing & needed_fields(fields)
+    fetched = get_key_cabin_details(key_cabin.name, {FIELD_SECTIONS[field] for field in wanted})
+    # a fetched section can fill in more of the missing fields than were asked for
+    filled = key_cabin.missing - fetched.missing
+    for field in filled:
+        setattr(key_cabin, field, getattr(fetched, field))
+    key_cabin.url = fetched.url
+    key_cabin.missing = key_cabin.missing - filled
+
+def get_search_cache() -> SearchCache:
+    global search_cache
+    if search_cache is None:
+        search_cache = SearchCache(ttl=SEARCH_CACHE_TTL)
+    return search_cache
+
+def search(bm, bd, by, em, ed, ey, adults=1, children=0, flex=""):
+    cache = get_search_cache() if SEARCH_CACHE_TTL > 0 else None
+    key = normalize_key(datetime.date(int(by), int(bm), int(bd)), datetime.date(int(ey), int(em), int(ed)), adults, children, flex)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    response = fetch(SEARCH_URL.format(bm, bd, by, em, ed, ey, adults, children, quote(flex or "")), "search")
+    if cache is not None and response.status_code == 200:
+        cache.put(key, response.content)
     return response.content
 
-def cabin_detail_thread(cabin_name, cabin_price, cabins_list):
-    key_cabin = get_key_cabin_details(cabin_name)
-    cabin_key_details_dict[cabin_name] = copy.deepcopy(key_cabin)
+# one lock per cabin so overlapping weekends never fetch the same detail page twice
+_detail_locks = {}
+_detail_locks_guard = threading.Lock()
+
+def cached_key_cabin_details(name: str, fields=None) -> KeyCabin:
+    """Details for a cabin, fetched at most once per run. The result is shared; copy before setting a price.
+
+    Only the requested fields (all by default) are guaranteed; a record fetched
+    for fewer fields is completed the first time a caller needs more.
+    """
+    needed = needed_fields(fields)
+    cached = cabin_key_details_dict.get(name)
+    if cached is not None and not (cached.missing & needed):
+        return cached
+    with _detail_locks_guard:
+        lock = _detail_locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in cabin_key_details_dict:
+            cabin_key_details_dict[name] = get_key_cabin_details(name, sections_for(fields))
+        elif cabin_key_details_dict[name].missing & needed:
+            # seeded from an old report or fetched for fewer fields; only the missing ones need fetching
+            complete_key_cabin_details(cabin_key_details_dict[name], needed)
+    return cabin_key_details_dict[name]
+
+def load_detail_cache(path: str = DETAIL_CACHE_FILE) -> int:
+    """Load saved cabin details into cabin_key_details_dict. Returns how many were loaded."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r') as f:
+        for d in json.load(f):
+            key_cabin = KeyCabin.from_dict(d)
+            if key_cabin.beds == 0 and "beds" not in key_cabin.missing:
+                # a missing detail page saved by an older version; fetch it again
+                continue
+            cabin_key_details_dict[d["name"]] = key_cabin
+    return len(cabin_key_details_dict)
+
+def save_detail_cache(path: str = DETAIL_CACHE_FILE):
+    # cabins whose detail page was missing are left out, so the next run fetches
+    # them again: they keep showing as rejected, and a CABIN_URL_NAMES entry added
+    # for one takes effect straight away
+    rejected = set(cabins_needing_url_names)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump([key_cabin.to_dict() for key_cabin in list(cabin_key_details_dict.values()) if key_cabin.name not in rejected], f)
+    os.replace(tmp_path, path)
+
+def cabin_detail_thread(cabin_name, cabin_price, cabins_list, fields=None):
+    key_cabin = copy.deepcopy(cached_key_cabin_details(cabin_name, fields))
     key_cabin.price = cabin_price
     cabins_list.append(key_cabin)
 
-def process_cabin_list(json_data) -> list[KeyCabin]:
+def uncached_cabin_names(json_data, fields=None) -> list[str]:
+    """Cabins in a search result whose details (the requested fields) would have to be fetched."""
+    needed = needed_fields(fields)
+    names = []
+    for item in json.loads(json_data):
+        cached = cabin_key_details_dict.get(item["name"])
+        if cached is None or cached.missing & needed:
+            names.append(item["name"])
+    return names
+
+def process_cabin_list(json_data, fields=None) -> list[KeyCabin]:
+    """KeyCabins with prices for a search result.
+
+    fields limits the details fetched and extracted to what the caller reads,
+    e.g. {"price", "occupancy"}; other fields are left at zero and listed in
+    each result's missing set. None fetches every field.
+    """
     railey_cabins = [Cabin.from_dict(item) for item in json.loads(json_data)]
+    needed = needed_fields(fields)
 
     key_cabins = []
     threads = []
     for cabin in railey_cabins:
-        if cabin.name in cabin_key_details_dict.keys():
+        if cabin.name in cabin_key_details_dict.keys() and not (cabin_key_details_dict[cabin.name].missing & needed):
             key_inst = copy.deepcopy(cabin_key_details_dict[cabin.name])
             key_inst.price = cabin.get_price()
             key_cabins.append(key_inst)
         else:
-            thread = threading.Thread(target=cabin_detail_thread, args=(cabin.name, cabin.get_price(), key_cabins))
+            thread = threading.Thread(target=cabin_detail_thread, args=(cabin.name, cabin.get_price(), key_cabins, fields))
             thread.start()
             threads.append(thread)
 
     for thread in threads:
         thread.join()
 
+    if threads:
+        print(f"Fetched {len(threads)} cabin details ({limiter.stats()})")
     return key_cabins
\ No newline at end of file
@@ -0,0 +1,61 @@
+#search_cache.py
+# Short-lived on-disk cache of availability search responses, shared by every
+# entry point (cabin_search, future_costs, the scheduler, ...) so that
+# back-to-back runs and tools querying the same weekend reuse one search.
+
+import datetime
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DEFAULT_PATH = "search-cache.sqlite"
+
+
+def normalize_key(begin: datetime.date, end: datetime.date, adults: int = 1, children: int = 0, flex: str = "") -> str:
+    """One key per distinct search, however the caller spelled the dates and counts."""
+    return f"{begin.isoformat()}|{end.isoformat()}|{int(adults)}|{int(children)}|{(flex or '').strip().lower()}"
+
+
+class SearchCache:
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = 900):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # one connection shared by the pipeline's threads, serialised by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, fetched REAL, body BLOB)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT fetched, body FROM searches WHERE key = ?", (key,)).fetchone()
+            hit = row is not None and time.time() - row[0] < self.ttl
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            with self._db:
+                self._db.execute("INSERT INTO stats VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                                 ("hits" if hit else "misses",))
+            return row[1] if hit else None
+
+    def put(self, key: str, body: bytes):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?)", (key, time.time(), body))
+            # expired entries are never read again
+            self._db.execute("DELETE FROM searches WHERE fetched < ?", (time.time() - self.ttl,))
+
+    def totals(self) -> tuple[int, int]:
+        """Hits and misses across every run that has used this cache file."""
+        with self._lock:
+            values = dict(self._db.execute("SELECT name, value FROM stats").fetchall())
+        return values.get("hits", 0), values.get("misses", 0)
+
+    def stats(self) -> str:
+        def rate(hits, misses):
+            return f"{hits}/{hits + misses} hits ({hits / (hits + misses):.0%})" if hits + misses else "no searches"
+        return f"search cache: this run {rate(self.hits, self.misses)}, all runs {rate(*self.totals())}"
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+#seed_cache.py
+# Seed the cabin detail cache from earlier output, so a fresh machine does not
+# have to crawl every detail page again. YAML reports give the url, occupancy
+# and per-level bed counts but not the bedroom or bath totals, so those
+# records are saved as partial and only the lodging counts get fetched later.
+# Scheduler state (refresh-state.json) and sweep queues (sweep.sqlite) hold
+# complete records and are imported as-is.
+
+import argparse
+import json
+import sqlite3
+from typing import Dict, List
+from cabin import KeyCabin
+
+# what a YAML report does not record
+YAML_MISSING_FIELDS = {"beds", "baths"}
+
+
+def records_from_yaml(path: str) -> List[KeyCabin]:
+    from report_formatter import parse_cabin_data
+    from report_model import ReportModel
+    from config import REQUIRED_AMENITIES
+    with open(path, 'r') as f:
+        model = ReportModel.from_dict(parse_cabin_data(f.read()))
+    # every cabin in a report passed the filters, so it has all the required amenities
+    required_names = [amenity.name for amenity in REQUIRED_AMENITIES]
+    records = []
+    for row in model.cabins.values():
+        if not row.prices:
+            continue
+        key_cabin = KeyCabin(
+            name=row.name,
+            occupancy=row.occupancy,
+            beds=0,
+            up_beds=row.up_beds,
+            main_beds=row.main_beds,
+            low_beds=row.low_beds,
+            gar_beds=row.gar_beds,
+            baths=0,
+            url=row.url,
+            amenities=required_names + list(row.amenities),
+        )
+        key_cabin.missing = set(YAML_MISSING_FIELDS)
+        records.append(key_cabin)
+    return records
+
+
+def records_from_state(path: str) -> List[KeyCabin]:
+    with open(path, 'r') as f:
+        state = json.load(f)
+    return [KeyCabin.from_dict(d) for entry in state.get("windows", {}).values() for d in entry.get("cabins", [])]
+
+
+def records_from_sweep(path: str) -> List[KeyCabin]:
+    db = sqlite3.connect(path)
+    try:
+        return [KeyCabin.from_dict(json.loads(data)) for (data,) in db.execute("SELECT data FROM details")]
+    finally:
+        db.close()
+
+
+def load_records(path: str) -> List[KeyCabin]:
+    if path.endswith((".yml", ".yaml")):
+        return records_from_yaml(path)
+    if path.endswith(".sqlite"):
+        return records_from_sweep(path)
+    return records_from_state(path)
+
+
+def merge_records(cache: Dict[str, KeyCabin], records: List[KeyCabin]) -> int:
+    """Add records to the cache, never replacing a record with one missing more fields. Returns records taken."""
+    taken = 0
+    for record in records:
+        record.price = 0.0
+        existing = cache.get(record.name)
+        if existing is None or len(record.missing) <= len(existing.missing):
+            cache[record.name] = record
+            taken += 1
+    return taken
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Seed the cabin detail cache from earlier reports and snapshots')
+    parser.add_argument('files', nargs='+',
+                       help='YAML reports (.yml), scheduler state (.json) or sweep queues (.sqlite), oldest first')
+    args = parser.parse_args(argv)
+
+    import scrape
+    scrape.load_detail_cache()
+    for path in args.files:
+        taken = merge_records(scrape.cabin_key_details_dict, load_records(path))
+        print(f"{path}: seeded {taken} cabin(s)")
+    scrape.save_detail_cache()
+    partial = sum(1 for key_cabin in scrape.cabin_key_details_dict.values() if key_cabin.missing)
+    print(f"{scrape.DETAIL_CACHE_FILE}: {len(scrape.cabin_key_details_dict)} cabin(s), {partial} partial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/python3
+#snapshot_diff.py
+# What changed between two YAML reports: price moves, cabins that became
+# available or were booked, and amenity changes.
+#
+#   python snapshot_diff.py old/cabin-report.yml cabin-report.yml
+#
+# Each report is indexed by (cabin, weekend) and the two indexes are compared
+# in one pass. Reports written by this project are read with a line scanner
+# that only understands our own report layout; a year-long, full-catalog
+# report takes PyYAML several seconds but the scanner a fraction of a second.
+# Hand-edited files the scanner does not recognise fall back to PyYAML.
+
+import argparse
+import html
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from report_model import ReportModel, parse_price
+
+
+@dataclass
+class SnapshotIndex:
+    # (cabin, weekend) -> price
+    prices: Dict[Tuple[str, str], float] = field(default_factory=dict)
+    # cabin -> optional amenities
+    amenities: Dict[str, frozenset] = field(default_factory=dict)
+    urls: Dict[str, str] = field(default_factory=dict)
+    weekends: List[str] = field(default_factory=list)
+    averages: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_model(cls, model: ReportModel) -> "SnapshotIndex":
+        index = cls()
+        for weekend in model.weekends:
+            index.weekends.append(weekend.name)
+            index.averages[weekend.name] = weekend.average
+            for cell in weekend.cells:
+                index.prices[(cell.cabin, cell.weekend)] = cell.price
+        for row in model.cabins.values():
+            index.amenities[row.name] = frozenset(row.amenities)
+            if row.url:
+                index.urls[row.name] = row.url
+        return index
+
+
+class UnrecognisedReport(ValueError):
+    pass
+
+
+def scan_report(text: str) -> SnapshotIndex:
+    """Index a report in the layout written by report_formatter.YamlReportWriter."""
+    index = SnapshotIndex()
+    prices = index.prices
+    section = None
+    weekend = cabin = None
+    amenities = None
+    for line in text.splitlines():
+        # cabin fields are by far the most common lines, so they are checked first
+        if line.startswith("    "):
+            if section == "prices" and cabin is not None:
+                if line.startswith("    Price: "):
+                    price = parse_price(line[11:])
+                    if price is None:
+                        raise UnrecognisedReport(line)
+                    prices[(cabin, weekend)] = price
+                elif line.startswith("    URL: "):
+                    index.urls[cabin] = line[9:]
+                # occupancy, beds and score are not compared
+            elif section == "amenities" and amenities is not None and line.startswith("    - "):
+                amenities.append(line[6:])
+            else:
+                raise UnrecognisedReport(line)
+        elif line.startswith("  "):
+            if section == "prices" and line.endswith('":') and line[2] == '"':
+                cabin = line[3:-2]
+            elif section == "amenities" and line.endswith(":"):
+                amenities = index.amenities[line[2:-1]] = []
+            elif section != "rejected" or not line.startswith("  - "):
+                raise UnrecognisedReport(line)
+        elif not line:
+            continue
+        elif line.startswith("Cabin prices for "):
+            section = "prices"
+            weekend = line[len("Cabin prices for "):-1]
+            cabin = None
+            index.weekends.append(weekend)
+            index.averages[weekend] = None
+        elif line.startswith("Average price for "):
+            name, _, value = line[len("Average price for "):].rpartition(": ")
+            index.averages[name] = parse_price(value)
+            section = None
+        elif line == "Cabin amenities:":
+            section = "amenities"
+        elif line == "Rejected cabins:":
+            section = "rejected"
+        elif line.startswith(("No cabins available for ", "Least Expensive Weekend: ", "Average Price: ")) or line == "No weekends have available cabins.":
+            section = None
+        else:
+            raise UnrecognisedReport(line)
+    index.amenities = {name: frozenset(values) for name, values in index.amenities.items()}
+    return index
+
+
+def load_index(path: str) -> SnapshotIndex:
+    with open(path, 'r') as f:
+        text = f.read()
+    try:
+        return scan_report(text)
+    except UnrecognisedReport:
+        from report_formatter import parse_cabin_data
+        return SnapshotIndex.from_model(ReportModel.from_dict(parse_cabin_data(text)))
+
+
+@dataclass
+class PriceChange:
+    cabin: str
+    weekend: str
+    old: float
+    new: float
+
+    @property
+    def delta(self) -> float:
+        return self.new - self.old
+
+
+@dataclass
+class Availability:
+    cabin: str
+    weekend: str
+    price: float
+
+
+@dataclass
+class AmenityChange:
+    cabin: str
+    added: List[str]
+    removed: List[str]
+
+
+@dataclass
+class SnapshotDiff:
+    price_changes: List[PriceChange] = field(default_factory=list)
+    # available now but not in the old report, and the other way round (usually booked)
+    added: List[Availability] = field(default_factory=list)
+    removed: List[Availability] = field(default_factory=list)
+    amenity_changes: List[AmenityChange] = field(default_factory=list)
+    # weekends only one report covers are listed but not compared
+    old_only_weekends: List[str] = field(default_factory=list)
+    new_only_weekends: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "price_changes": [{"cabin": c.cabin, "weekend": c.weekend, "old": c.old, "new": c.new, "delta": round(c.delta, 2)}
+                              for c in self.price_changes],
+            "added": [{"cabin": a.cabin, "weekend": a.weekend, "price": a.price} for a in self.added],
+            "removed": [{"cabin": a.cabin, "weekend": a.weekend, "price": a.price} for a in self.removed],
+            "amenity_changes": [{"cabin": c.cabin, "added": c.added, "removed": c.removed} for c in self.amenity_changes],
+            "old_only_weekends": self.old_only_weekends,
+            "new_only_weekends": self.new_only_weekends,
+        }
+
+    def summary(self) -> str:
+        up = sum(1 for c in self.price_changes if c.delta > 0)
+        return (f"{len(self.price_changes)} price change(s) ({up} up, {len(self.price_changes) - up} down), "
+                f"{len(self.added)} newly available, {len(self.removed)} no longer available, "
+                f"{len(self.amenity_changes)} amenity change(s)")
+
+
+def diff(old: SnapshotIndex, new: SnapshotIndex, min_delta: float = 0.01) -> SnapshotDiff:
+    """Compare two snapshot indexes. Price moves smaller than min_delta are ignored."""
+    from report_formatter import sort_weekends
+    result = SnapshotDiff()
+    old_weekends = set(old.weekends)
+    new_weekends = set(new.weekends)
+    common = old_weekends & new_weekends
+    result.old_only_weekends = [w for w in old.weekends if w not in new_weekends]
+    result.new_only_weekends = [w for w in new.weekends if w not in old_weekends]
+
+    for key, old_price in old.prices.items():
+        if key[1] not in common:
+            continue
+        new_price = new.prices.get(key)
+        if new_price is None:
+            result.removed.append(Availability(key[0], key[1], old_price))
+        elif abs(new_price - old_price) >= min_delta:
+            result.price_changes.append(PriceChange(key[0], key[1], old_price, new_price))
+    for key, new_price in new.prices.items():
+        if key[1] in common and key not in old.prices:
+            result.added.append(Availability(key[0], key[1], new_price))
+
+    for name, new_amenities in new.amenities.items():
+        old_amenities = old.amenities.get(name)
+        if old_amenities is not None and old_amenities != new_amenities:
+            result.amenity_changes.append(AmenityChange(name, sorted(new_amenities - old_amenities), sorted(old_amenities - new_amenities)))
+
+    order = {weekend: i for i, weekend in enumerate(sort_weekends(list(common)))}
+    result.price_changes.sort(key=lambda c: (-abs(c.delta), order[c.weekend], c.cabin))
+    result.added.sort(key=lambda a: (order[a.weekend], a.cabin))
+    result.removed.sort(key=lambda a: (order[a.weekend], a.cabin))
+    result.amenity_changes.sort(key=lambda c: c.cabin)
+    return result
+
+
+DIFF_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        table { border-collapse: collapse; margin-bottom: 24px; }
+        th, td { border: 1px solid #ddd; padding: 6px 10px; }
+        th { background-color: #4CAF50; color: white; }
+        td.num { text-align: right; }
+        .up { background-color: #ffebee; }
+        .down { background-color: #C8E6C9; }
+        a { color: #2c5aa0; text-decoration: none; }
+    </style>
+</head>
+<body>
+    <h1>Cabin Price Changes</h1>
+"""
+
+
+def generate_diff_html(result: SnapshotDiff, urls: Dict[str, str], old_label: str, new_label: str) -> str:
+    def cabin_cell(name: str) -> str:
+        url = urls.get(name)
+        label = html.escape(name)
+        return f"<td><a href='{html.escape(url)}' target='_blank'>{label}</a></td>" if url else f"<td>{label}</td>"
+
+    out = [DIFF_HEAD]
+    out.append(f"    <p>{html.escape(old_label)} &rarr; {html.escape(new_label)}</p>\n")
+    out.append(f"    <p>{html.escape(result.summary())}</p>\n")
+    if result.old_only_weekends or result.new_only_weekends:
+        out.append(f"    <p>Not compared: {html.escape(', '.join(result.old_only_weekends + result.new_only_weekends))}</p>\n")
+
+    if result.price_changes:
+        out.append("    <h2>Price changes</h2>\n    <table>\n"
+                   "        <tr><th>Cabin</th><th>Weekend</th><th>Old</th><th>New</th><th>Change</th></tr>\n")
+        for c in result.price_changes:
+            css = "up" if c.delta > 0 else "down"
+            out.append(f"        <tr class='{css}'>{cabin_cell(c.cabin)}<td>{html.escape(c.weekend)}</td>"
+                       f"<td class='num'>${c.old:,.2f}</td><td class='num'>${c.new:,.2f}</td>"
+                       f"<td class='num'>{c.delta:+,.2f} ({f'{c.delta / c.old:+.0%}' if c.old else 'n/a'})</td></tr>\n")
+        out.append("    </table>\n")
+
+    for title, entries in (("Newly available", result.added), ("No longer available", result.removed)):
+        if entries:
+            out.append(f"    <h2>{title}</h2>\n    <table>\n        <tr><th>Cabin</th><th>Weekend</th><th>Price</th></tr>\n")
+            for a in entries:
+                out.append(f"        <tr>{cabin_cell(a.cabin)}<td>{html.escape(a.weekend)}</td><td class='num'>${a.price:,.2f}</td></tr>\n")
+            out.append("    </table>\n")
+
+    if result.amenity_changes:
+        out.append("    <h2>Amenity changes</h2>\n    <table>\n        <tr><th>Cabin</th><th>Added</th><th>Removed</th></tr>\n")
+        for c in result.amenity_changes:
+            out.append(f"        <tr>{cabin_cell(c.cabin)}<td>{html.escape(', '.join(c.added)) or '—'}</td>"
+                       f"<td>{html.escape(', '.join(c.removed)) or '—'}</td></tr>\n")
+        out.append("    </table>\n")
+
+    out.append("</body>\n</html>\n")
+    return "".join(out)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Report what changed between two YAML cabin reports')
+    parser.add_argument('old', help='earlier YAML report')
+    parser.add_argument('new', nargs='?', default='cabin-report.yml',
+                       help='later YAML report (default: cabin-report.yml)')
+    parser.add_argument('--output', '-o', default='cabin-changes.html',
+                       help='filename for the HTML change report (default: cabin-changes.html)')
+    parser.add_argument('--json', default='cabin-changes.json',
+                       help='filename for the JSON change report (default: cabin-changes.json)')
+    parser.add_argument('--min-delta', type=float, default=1.0,
+                       help='ignore price moves smaller than this many dollars (default: 1)')
+    args = parser.parse_args(argv)
+
+    old = load_index(args.old)
+    new = load_index(args.new)
+    result = diff(old, new, args.min_delta)
+
+    with open(args.json, 'w') as f:
+        json.dump(result.to_dict(), f)
+    with open(args.output, 'w') as f:
+        f.write(generate_diff_html(result, {**old.urls, **new.urls}, args.old, args.new))
+    print(result.summary())
+    print(f"Wrote {args.output} and {args.json}")
+
+
+if __name__ == "__main__":
+    main()
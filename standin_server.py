@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+#standin_server.py
+# Local stand-in for the rental site, for exercising the scraper without
+# touching the real thing. Serves the availability search and cabin detail
+# pages, either from saved pages (as written by page_download.py) or
+# synthesised, and can simulate a site with limited capacity: requests beyond
+# --capacity get slower, and beyond twice the capacity get 429s.
+#
+#   python standin_server.py --cabins 200 --capacity 8 &
+#   RAILEY_SITE_URL=http://localhost:8000 python cabin_search.py
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+UPPER_BEDS = "Upper Level: Bedroom"
+MAIN_BEDS = "Main Level: Bedroom"
+LOWER_BEDS = "Lower Level: Bedroom"
+AMENITY_KEYS = ["Grills (Gas)", "A/C: Central Air", "Internet: Wifi", "Outdoor Fire Pit",
+                "Swimming Pool (Community)", "Pool Table", "Home Theater", "Hot Tub", "Dishwasher"]
+
+
+def cabin_names(count: int) -> list[str]:
+    return [f"Standin Cabin {i:04d}" for i in range(count)]
+
+
+def url_name(name: str) -> str:
+    return name.lower().replace(" ", "-")
+
+
+def synthetic_detail_page(name: str, padding_kb: int) -> str:
+    rng = random.Random(name)
+    occupancy = rng.randint(10, 20)
+    amenities = AMENITY_KEYS[:4] + rng.sample(AMENITY_KEYS[4:], rng.randint(0, 3))
+    bedrooms = [UPPER_BEDS] * rng.randint(1, 3) + [MAIN_BEDS] * rng.randint(1, 2) + [LOWER_BEDS] * rng.randint(0, 3)
+    parts = [
+        "<html><head><title>", name, "</title></head><body>",
+        f"<div class='rc-lodging-beds'>{len(bedrooms)} Bedrooms</div>",
+        f"<div class='rc-lodging-baths'>{rng.randint(3, 6)} Baths</div>",
+        f"<div class='rc-lodging-occ'>Sleeps {occupancy}</div>",
+        "<ul class='bedrooms'>",
+        *[f"<li>{level} {i + 1}</li>" for i, level in enumerate(bedrooms)],
+        "</ul><ul class='amenities'>",
+        *[f"<li class='amenity-list-item'>{amenity}</li>" for amenity in amenities],
+        "</ul>",
+        # stands in for the reviews, scripts and galleries the scraper does not need
+        "<div class='reviews'>", "<p>Lovely stay, would book again.</p>" * (padding_kb * 1024 // 36), "</div>",
+        "</body></html>",
+    ]
+    return "".join(parts)
+
+
+class StandInSite:
+    def __init__(self, names: list[str], pages_dir: str, latency: float, capacity: int, padding_kb: int):
+        self.names = names
+        self.pages_dir = pages_dir
+        self.latency = latency
+        self.capacity = capacity
+        self.padding_kb = padding_kb
+        self.active = 0
+        self.served = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def enter(self) -> bool:
+        """Start a request; False means reject it with a 429."""
+        with self.lock:
+            if self.capacity and self.active >= 2 * self.capacity:
+                self.rejected += 1
+                return False
+            self.active += 1
+            overload = max(0, self.active - self.capacity) if self.capacity else 0
+        # past capacity each extra concurrent request slows everyone down
+        time.sleep(self.latency * (1 + overload))
+        return True
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+            self.served += 1
+
+    def search_results(self) -> bytes:
+        items = []
+        for i, name in enumerate(self.names):
+            price = round(random.Random(name).uniform(1200, 5000), 2)
+            items.append({"eid": i, "name": name, "type": 1,
+                          "prices": [{"eid": i, "p": price, "c": "USD", "n": "Total", "qp": None}]})
+        return json.dumps(items).encode()
+
+    def detail_page(self, page_name: str) -> bytes:
+        if self.pages_dir:
+            path = os.path.join(self.pages_dir, page_name + ".html")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+        for name in self.names:
+            if url_name(name) == page_name:
+                return synthetic_detail_page(name, self.padding_kb).encode()
+        return b""
+
+
+def make_handler(site: StandInSite):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not site.enter():
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.end_headers()
+                return
+            try:
+                path = urlparse(self.path).path
+                if path.startswith("/rcapi/item/avail/search"):
+                    body, content_type = site.search_results(), "application/json"
+                elif path.startswith("/vacation-rentals/"):
+                    body, content_type = site.detail_page(path[len("/vacation-rentals/"):]), "text/html"
+                else:
+                    body, content_type = b"", "text/plain"
+                self.send_response(200 if body else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # the client closed early (e.g. a streaming detail fetch that got what it needed)
+                pass
+            finally:
+                site.leave()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the rental site')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cabins', type=int, default=100,
+                       help='number of synthetic cabins returned by the search (default: 100)')
+    parser.add_argument('--pages',
+                       help='directory of saved detail pages named <url-name>.html, served in place of synthetic ones')
+    parser.add_argument('--latency', type=float, default=0.05,
+                       help='seconds per request when under capacity (default: 0.05)')
+    parser.add_argument('--capacity', type=int, default=0,
+                       help='concurrent requests served at full speed; 0 for unlimited (default: 0)')
+    parser.add_argument('--padding-kb', type=int, default=200,
+                       help='size of the filler after the detail sections of synthetic pages (default: 200)')
+    args = parser.parse_args(argv)
+
+    names = cabin_names(args.cabins)
+    if args.pages:
+        names += [f[:-len(".html")].replace("-", " ").title() for f in sorted(os.listdir(args.pages)) if f.endswith(".html")]
+    site = StandInSite(names, args.pages, args.latency, args.capacity, args.padding_kb)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(site))
+    print(f"Stand-in site on http://127.0.0.1:{args.port} ({len(names)} cabins)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Served {site.served} requests, rejected {site.rejected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+#sweep.py
+# Sharded sweeps over a SQLite work queue. `init` queues one search task per
+# weekend; any number of `work` processes on this machine lease tasks one at a
+# time. The queue runs in WAL mode, which needs shared memory on one host, so
+# it must stay on a local disk: workers on other machines sharing the file
+# over a network filesystem are not supported. A search task records the
+# weekend's prices and queues a detail task for every cabin not seen before;
+# a detail task records that cabin's details. Leases expire, so tasks held by
+# a worker that died are picked up again. `merge` joins everything into one
+# snapshot and writes the usual reports.
+#
+#   python sweep.py init --weeks 26
+#   python sweep.py work --workers 4
+#   python sweep.py merge
+
+import argparse
+import datetime
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from scheduler import window_key
+
+DEFAULT_QUEUE = "sweep.sqlite"
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    lease_until REAL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (kind, key)
+);
+-- window is scheduler.window_key: the dates, since weekend names can repeat across years
+CREATE TABLE IF NOT EXISTS prices (
+    window TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    cabin TEXT NOT NULL,
+    price REAL,
+    PRIMARY KEY (window, cabin)
+);
+CREATE TABLE IF NOT EXISTS details (
+    cabin TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    rejected INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, timeout=60, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def enqueue(db: sqlite3.Connection, kind: str, key: str, payload) -> bool:
+    """Queue a task unless one with the same kind and key already exists."""
+    cursor = db.execute("INSERT OR IGNORE INTO tasks (kind, key, payload) VALUES (?, ?, ?)", (kind, key, json.dumps(payload)))
+    return cursor.rowcount > 0
+
+
+def lease(db: sqlite3.Connection, worker: str) -> Optional[tuple]:
+    """Atomically take the next pending (or abandoned) task. Returns (id, kind, payload) or None."""
+    now = time.time()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        # searches first, so detail tasks for every weekend are queued as early as possible
+        row = db.execute(
+            "SELECT id, kind, payload FROM tasks "
+            "WHERE (state = 'pending' OR (state = 'leased' AND lease_until < ?)) AND attempts < ? "
+            "ORDER BY kind = 'detail', id LIMIT 1", (now, MAX_ATTEMPTS)).fetchone()
+        if row is not None:
+            db.execute("UPDATE tasks SET state = 'leased', lease_until = ?, worker = ?, attempts = attempts + 1 WHERE id = ?",
+                       (now + LEASE_SECONDS, worker, row[0]))
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    return (row[0], row[1], json.loads(row[2])) if row else None
+
+
+def remaining(db: sqlite3.Connection) -> int:
+    return db.execute("SELECT COUNT(*) FROM tasks WHERE state != 'done' AND attempts < ?", (MAX_ATTEMPTS,)).fetchone()[0]
+
+
+def run_search(db: sqlite3.Connection, window: list):
+    import scrape
+    from cabin import Cabin
+    name, bm, bd, by, em, ed, ey = window
+    key = window_key(window)
+    print(f"Processing {name}...")
+    cabins = [Cabin.from_dict(item) for item in json.loads(scrape.search(bm, bd, by, em, ed, ey))]
+    db.execute("BEGIN IMMEDIATE")
+    db.execute("DELETE FROM prices WHERE window = ?", (key,))
+    db.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?)",
+                   [(key, position, cabin.name, cabin.get_price()) for position, cabin in enumerate(cabins)])
+    for cabin in cabins:
+        enqueue(db, "detail", cabin.name, cabin.name)
+    db.execute("COMMIT")
+
+
+def run_detail(db: sqlite3.Connection, cabin_name: str):
+    import scrape
+    # served from detail-cache.json when the cabin was seen by an earlier run
+    key_cabin = scrape.cached_key_cabin_details(cabin_name)
+    rejected = cabin_name in scrape.get_cabins_needing_url_names()
+    db.execute("INSERT OR REPLACE INTO details VALUES (?, ?, ?)", (cabin_name, json.dumps(key_cabin.to_dict()), int(rejected)))
+
+
+def work(path: str, worker: str, idle_exit: float = 5.0) -> int:
+    """Process tasks until the queue has been empty for idle_exit seconds. Returns tasks done."""
+    import scrape
+    scrape.load_detail_cache()
+    db = connect(path)
+    done = 0
+    idle_since = None
+    while True:
+        task = lease(db, worker)
+        if task is None:
+            # other workers may still be running searches that queue more detail tasks
+            if remaining(db) == 0:
+                break
+            idle_since = idle_since or time.monotonic()
+            if time.monotonic() - idle_since > max(idle_exit, LEASE_SECONDS + 1):
+                break
+            time.sleep(0.5)
+            continue
+        idle_since = None
+        task_id, kind, payload = task
+        try:
+            if kind == "search":
+                run_search(db, payload)
+            else:
+                run_detail(db, payload)
+        except Exception as e:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            print(f"{worker}: {kind} task {payload!r} failed: {e}")
+            db.execute("UPDATE tasks SET state = 'pending', lease_until = NULL WHERE id = ?", (task_id,))
+            continue
+        db.execute("UPDATE tasks SET state = 'done', lease_until = NULL WHERE id = ?", (task_id,))
+        done += 1
+    db.close()
+    return done
+
+
+def snapshot(db: sqlite3.Connection, windows: List[list]) -> Dict:
+    """Merge prices and details into KeyCabin lists keyed by weekend name, in search order."""
+    from cabin import KeyCabin
+    details = {cabin: json.loads(data) for cabin, data in db.execute("SELECT cabin, data FROM details")}
+    cabin_price_list_by_weekend = {}
+    for window in windows:
+        cabins = []
+        for cabin_name, price in db.execute("SELECT cabin, price FROM prices WHERE window = ? ORDER BY position", (window_key(window),)):
+            if cabin_name in details:
+                key_cabin = KeyCabin.from_dict(details[cabin_name])
+                key_cabin.price = price
+                cabins.append(key_cabin)
+        cabin_price_list_by_weekend[window[0]] = cabins
+    return cabin_price_list_by_weekend
+
+
+def status(db: sqlite3.Connection) -> str:
+    lines = []
+    for kind, state, count in db.execute("SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state ORDER BY kind, state"):
+        lines.append(f"  {kind:<7}{state:<8}{count}")
+    failed = db.execute("SELECT COUNT(*) FROM tasks WHERE state != 'done' AND attempts >= ?", (MAX_ATTEMPTS,)).fetchone()[0]
+    if failed:
+        lines.append(f"  {failed} task(s) gave up after {MAX_ATTEMPTS} attempts")
+    return "\n".join(lines) or "  queue is empty"
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Shard a sweep across worker processes on this machine')
+    parser.add_argument('--queue', default=DEFAULT_QUEUE,
+                       help=f'SQLite queue file shared by all workers (default: {DEFAULT_QUEUE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    init = commands.add_parser('init', help='queue a search task for each weekend')
+    init.add_argument('--weeks', type=int, default=26,
+                      help='how many upcoming weekends to sweep (default: 26)')
+    init.add_argument('--reset', action='store_true',
+                      help='discard tasks and results from a previous sweep in the same queue file')
+    worker = commands.add_parser('work', help='process tasks until the queue is drained')
+    worker.add_argument('--workers', type=int, default=1,
+                        help='worker processes to start on this machine (default: 1)')
+    merge = commands.add_parser('merge', help='merge results and write the reports')
+    merge.add_argument('--output', '-o', default='cabin-report.html',
+                       help='filename for the HTML output report (default: cabin-report.html)')
+    commands.add_parser('status', help='show task counts')
+    args = parser.parse_args(argv)
+
+    db = connect(args.queue)
+    if args.command == 'init':
+        from cabin_search import weekend_windows
+        if args.reset:
+            db.executescript("DELETE FROM tasks; DELETE FROM prices; DELETE FROM details;")
+        today = datetime.date.today()
+        windows = weekend_windows(today, today + datetime.timedelta(weeks=args.weeks))
+        queued = sum(enqueue(db, "search", window_key(window), list(window)) for window in windows)
+        print(f"Queued {queued} search task(s) in {args.queue}")
+    elif args.command == 'work':
+        import multiprocessing
+        host = socket.gethostname()
+        names = [f"{host}:{os.getpid()}:{i}" for i in range(args.workers)]
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            counts = pool.starmap(work, [(args.queue, name) for name in names])
+        elapsed = time.perf_counter() - start
+        print(f"{sum(counts)} task(s) in {elapsed:.1f}s across {args.workers} worker(s)")
+    elif args.command == 'merge':
+        from cabin_search import passes_filters, write_reports
+        windows = [json.loads(payload) for (payload,) in db.execute("SELECT payload FROM tasks WHERE kind = 'search' ORDER BY id")]
+        merged = {name: [c for c in cabins if passes_filters(c)] for name, cabins in snapshot(db, windows).items()}
+        import scrape
+        scrape.cabins_needing_url_names.extend(cabin for (cabin,) in db.execute("SELECT cabin FROM details WHERE rejected"))
+        write_reports(merged, args.output, months_to_include=None)
+        # workers only read the detail cache; the sweep's details are saved to it once, here
+        from cabin import KeyCabin
+        scrape.load_detail_cache()
+        for cabin, data in db.execute("SELECT cabin, data FROM details WHERE NOT rejected"):
+            scrape.cabin_key_details_dict[cabin] = KeyCabin.from_dict(json.loads(data))
+        scrape.save_detail_cache()
+    print(status(db))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
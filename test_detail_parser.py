@@ -0,0 +1,121 @@
+#test_detail_parser.py
+# The streaming detail parser must extract the same fields however the page
+# is cut into chunks: a text node split across two feed() calls still has to
+# match its bedroom label or amenity key.
+#
+#   python -m pytest -q test_detail_parser.py
+
+import pytest
+import detail_parser
+
+BED_LABELS = ["Upper Level: Bedroom", "Main Level: Bedroom", "Lower Level: Bedroom", "Above Garage: Bedroom"]
+
+# laid out like the site's detail pages: nested spans, indentation, a comment
+# and a <br/> between the sections the scraper reads
+PAGE = """<!DOCTYPE html>
+<html><head><title>Almost Heaven</title></head><body>
+  <div class="rc-lodging-detail">
+    <span class="rc-lodging-beds"> 5 Bedrooms </span>
+    <span class="rc-lodging-baths">4 Baths</span>
+    <span class="rc-lodging-occ">Sleeps 16</span>
+  </div>
+  <!-- bedroom listing -->
+  <div class="bedrooms">
+    <div class="bedroom"><h4>Upper Level: Bedroom 1</h4><p>King</p></div>
+    <div class="bedroom"><h4>Upper Level: Bedroom 2</h4><p>Queen<br/>Twin</p></div>
+    <div class="bedroom"><h4>Main Level: Bedroom 3</h4><p>King</p></div>
+    <div class="bedroom"><h4>Lower Level: Bedroom 4</h4><p>Bunks</p></div>
+    <div class="bedroom"><h4>Above Garage: Bedroom 5</h4><p>Queen &amp; Twin</p></div>
+  </div>
+  <ul class="amenities">
+    <li class="amenity-list-item"><span>Outdoor</span> Grills (Gas)</li>
+    <li class="amenity-list-item">A/C: Central Air</li>
+    <li class="amenity-list-item">Internet: Mesh WIFI System</li>
+    <li class="amenity-list-item">Outdoor Fire Pit</li>
+    <li class="amenity-list-item">Swimming Pool (Community) &ndash; seasonal</li>
+    <li class="amenity-list-item">Pool Table</li>
+  </ul>
+  <div class="reviews"><p>Lovely stay, would book again.</p></div>
+</body></html>
+""".encode()
+
+# amenities split into category lists, inside a container named for them
+PAGE_GROUPED = """<html><body>
+  <span class="rc-lodging-beds">2 Bedrooms</span><span class="rc-lodging-baths">2 Baths</span><span class="rc-lodging-occ">Sleeps 6</span>
+  <div><h4>Upper Level: Bedroom 1</h4><h4>Main Level: Bedroom 2</h4></div>
+  <div class="property-amenities">
+    <div class="amenity-group"><h3>Kitchen</h3><ul><li class="amenity-list-item">Dishwasher</li></ul></div>
+    <div class="amenity-group"><h3>Outdoor</h3><ul>
+      <li class="amenity-list-item">Grills (Gas)</li><li class="amenity-list-item">Outdoor Fire Pit</li></ul></div>
+    <div class="amenity-group"><h3>Comfort</h3><ul>
+      <li class="amenity-list-item">A/C: Central Air</li><li class="amenity-list-item">Internet: Wifi</li></ul></div>
+  </div>
+  <div class="reviews"><p>Lovely stay, would book again.</p></div>
+</body></html>
+""".encode()
+
+# the same lists in containers whose classes do not say what they hold
+PAGE_GROUPED_PLAIN = PAGE_GROUPED.replace(b'class="property-amenities"', b'id="features"').replace(b' class="amenity-group"', b'')
+
+
+def fields(parser: detail_parser.DetailParser) -> dict:
+    return {"lodging_text": parser.lodging_text, "amenity_items": parser.amenity_items, "bed_label_counts": parser.bed_label_counts}
+
+
+def parse_split(offset: int, page: bytes = PAGE) -> dict:
+    parser = detail_parser.DetailParser(BED_LABELS)
+    parser.feed_bytes(page[:offset])
+    parser.feed_bytes(page[offset:])
+    parser.close()
+    return fields(parser)
+
+
+def test_every_split_offset_matches_whole_page():
+    whole = parse_split(len(PAGE))
+    assert whole["bed_label_counts"] == {label: 1 for label in BED_LABELS[1:]} | {BED_LABELS[0]: 2}
+    assert len(whole["amenity_items"]) == 6
+    for offset in range(1, len(PAGE)):
+        assert parse_split(offset) == whole, f"split at byte {offset}"
+
+
+def test_every_split_offset_matches_soup():
+    pytest.importorskip("bs4")
+    pytest.importorskip("requests")
+    import scrape
+    soup = scrape.parse_details_soup(PAGE)
+    for offset in range(1, len(PAGE)):
+        streamed = parse_split(offset)
+        assert streamed["lodging_text"] == soup["lodging_text"], f"split at byte {offset}"
+        assert streamed["bed_label_counts"] == soup["bed_label_counts"], f"split at byte {offset}"
+        assert scrape.match_amenities(streamed["amenity_items"]) == scrape.match_amenities(soup["amenity_items"]), f"split at byte {offset}"
+
+
+def test_parse_stream_small_chunks():
+    # chunks far smaller than the page put boundaries inside every text node
+    chunks = [PAGE[start:start + 7] for start in range(0, len(PAGE), 7)]
+    parser = detail_parser.parse_stream(chunks, BED_LABELS)
+    assert parser.bed_label_counts[BED_LABELS[0]] == 2
+    assert parser.bytes_read <= len(PAGE)
+    assert fields(parser) == parse_split(len(PAGE))
+
+
+def test_parse_stream_feed_slices():
+    # parse_stream feeds each downloaded chunk in FEED_SIZE slices; shifting the
+    # page by every amount up to FEED_SIZE puts a slice boundary at every byte of it
+    whole = parse_split(len(PAGE))
+    for shift in range(detail_parser.FEED_SIZE):
+        page = b" " * shift + PAGE
+        parser = detail_parser.parse_stream([page[:16 * 1024], page[16 * 1024:]], BED_LABELS)
+        assert fields(parser) == whole, f"page shifted by {shift} bytes"
+
+
+@pytest.mark.parametrize("page, stops_early", [(PAGE_GROUPED, True), (PAGE_GROUPED_PLAIN, False)])
+def test_amenities_in_several_lists(page, stops_early):
+    whole = parse_split(len(page), page)
+    assert len(whole["amenity_items"]) == 5
+    # parsing must not stop when the first category list closes
+    chunks = [page[start:start + 7] for start in range(0, len(page), 7)]
+    parser = detail_parser.parse_stream(chunks, BED_LABELS)
+    assert fields(parser) == whole
+    # only a container named for the amenities shows where they end
+    assert (parser.bytes_read < len(page)) == stops_early
@@ -0,0 +1,91 @@
+#test_sweep.py
+# Sweep queue leases: a task held by a worker that stopped is picked up again
+# once its lease expires, and given up after MAX_ATTEMPTS.
+#
+#   python -m pytest -q test_sweep.py
+
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+import sweep
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = sweep.connect(str(tmp_path / "sweep.sqlite"))
+    yield db
+    db.close()
+
+
+def test_expired_lease_is_leased_again(db, monkeypatch):
+    monkeypatch.setattr(sweep, "LEASE_SECONDS", 0.2)
+    window = ["June Weekend 1", 6, 5, 2026, 6, 7, 2026]
+    sweep.enqueue(db, "search", sweep.window_key(window), window)
+
+    task_id, kind, payload = sweep.lease(db, "worker-a")
+    assert kind == "search"
+    # still held by worker-a
+    assert sweep.lease(db, "worker-b") is None
+
+    time.sleep(0.3)
+    task = sweep.lease(db, "worker-b")
+    assert task is not None and task[0] == task_id
+    assert db.execute("SELECT worker, attempts FROM tasks WHERE id = ?", (task_id,)).fetchone() == ("worker-b", 2)
+
+
+def test_gives_up_after_max_attempts(db, monkeypatch):
+    monkeypatch.setattr(sweep, "LEASE_SECONDS", 0.05)
+    sweep.enqueue(db, "detail", "Almost Heaven", "Almost Heaven")
+    for attempt in range(sweep.MAX_ATTEMPTS):
+        assert sweep.lease(db, f"worker-{attempt}") is not None
+        time.sleep(0.1)
+    assert sweep.lease(db, "worker-last") is None
+    assert sweep.remaining(db) == 0
+
+
+def test_work_finishes_tasks_of_a_dead_worker(tmp_path, monkeypatch):
+    pytest.importorskip("bs4")
+    pytest.importorskip("requests")
+    import scrape
+    from standin_server import StandInSite, cabin_names, make_handler
+    from throttle import AdaptiveLimiter
+
+    site = StandInSite(cabin_names(5), None, latency=0.0, capacity=0, padding_kb=1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(scrape, "SEARCH_URL", scrape.SEARCH_URL.replace(scrape.SITE_URL, base, 1))
+    monkeypatch.setattr(scrape, "SITE_URL", base)
+    monkeypatch.setattr(scrape, "limiter", AdaptiveLimiter())
+    monkeypatch.setattr(scrape, "SEARCH_CACHE_TTL", 0)
+    monkeypatch.setattr(sweep, "LEASE_SECONDS", 0.5)
+    monkeypatch.setattr(scrape, "cabin_key_details_dict", {})
+    monkeypatch.chdir(tmp_path)
+    # one cabin is already in the detail cache and must not be fetched again
+    cached = scrape.KeyCabin(name="Standin Cabin 0000", occupancy=14, beds=5, up_beds=2, main_beds=2, low_beds=1, gar_beds=0, baths=4, url="", amenities=[])
+    with open("detail-cache.json", 'w') as f:
+        json.dump([cached.to_dict()], f)
+
+    path = str(tmp_path / "sweep.sqlite")
+    db = sweep.connect(path)
+    # the same weekend name a year apart must not share tasks or prices
+    windows = [["June Weekend 1", 6, 5, 2026, 6, 7, 2026], ["June Weekend 1", 6, 4, 2027, 6, 6, 2027]]
+    for window in windows:
+        sweep.enqueue(db, "search", sweep.window_key(window), window)
+    # a worker takes the first search and dies without finishing it
+    assert sweep.lease(db, "dead-worker") is not None
+    try:
+        assert sweep.work(path, "worker-b", idle_exit=0.1) == 7
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert db.execute("SELECT COUNT(*) FROM tasks WHERE state = 'done'").fetchone()[0] == 7
+    assert db.execute("SELECT COUNT(*) FROM details").fetchone()[0] == 5
+    assert [count for (count,) in db.execute("SELECT COUNT(*) FROM prices GROUP BY window")] == [5, 5]
+    # two searches and the four uncached detail pages
+    assert site.served == 6
+    db.close()
@@ -0,0 +1,146 @@
+#test_throttle.py
+# AdaptiveLimiter backs off when the site pushes back and resumes after its
+# breaker pause, both fed statuses directly and against standin_server.py.
+#
+#   python -m pytest -q test_throttle.py
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from standin_server import StandInSite, cabin_names, make_handler, url_name
+import throttle
+from throttle import AdaptiveLimiter, BACKOFF_STATUSES
+
+
+def test_halves_limit_on_429():
+    limiter = AdaptiveLimiter(initial_limit=8, breaker_threshold=100)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(0.01, 429)
+    assert limiter.limit == 1
+    assert limiter.failures == 3
+    assert limiter.breaker_trips == 0
+
+
+def test_breaker_pauses_then_probes_then_reopens():
+    limiter = AdaptiveLimiter(initial_limit=4, breaker_threshold=2, breaker_cooldown=0.3)
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release(0.01, 503)
+    assert limiter.breaker_trips == 1
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.25
+    assert limiter.probing
+
+    # nothing else goes out while the probe is in flight
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    limiter.release(0.01, 200)
+    waiter.join(1)
+    assert not waiter.is_alive()
+    assert not limiter.probing
+    limiter.release(0.01, 200)
+    assert limiter.in_flight == 0
+
+
+def test_failed_probe_pauses_again():
+    limiter = AdaptiveLimiter(breaker_threshold=1, breaker_cooldown=0.1)
+    limiter.acquire()
+    limiter.release(0.01, None)
+    limiter.acquire()
+    assert limiter.probing
+    limiter.release(0.01, 429)
+    assert limiter.breaker_trips == 2
+    assert limiter.open_until > time.monotonic()
+
+
+def test_against_standin_server():
+    # a site that serves 2 requests at full speed and rejects beyond 4 with 429 and Retry-After: 1
+    names = cabin_names(40)
+    site = StandInSite(names, None, latency=0.02, capacity=2, padding_kb=1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    limiter = AdaptiveLimiter(initial_limit=16, breaker_cooldown=1.0)
+    statuses = []
+
+    def get(name):
+        # the retry loop of scrape.fetch, without its requests dependency
+        while True:
+            limiter.acquire()
+            start = time.monotonic()
+            try:
+                with urllib.request.urlopen(f"{base}/vacation-rentals/{url_name(name)}", timeout=10) as response:
+                    response.read()
+                    status, retry_after = response.status, None
+            except urllib.error.HTTPError as e:
+                status, retry_after = e.code, e.headers.get("Retry-After")
+            limiter.release(time.monotonic() - start, status, float(retry_after) if retry_after else None)
+            if status not in BACKOFF_STATUSES:
+                statuses.append(status)
+                return
+
+    try:
+        threads = [threading.Thread(target=get, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert statuses == [200] * len(names)
+    assert site.rejected > 0
+    # it backed off, paused at least once, and came back to finish every page
+    assert limiter.failures == site.rejected
+    assert limiter.breaker_trips >= 1
+    assert limiter.limit < 16
+    assert limiter.in_flight == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def run_requests(limiter, clock, count, latency, kind="request"):
+    for _ in range(count):
+        limiter.acquire()
+        clock.now += latency
+        limiter.release(latency, 200, kind=kind)
+
+
+def test_recovers_after_lasting_latency_shift(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, "time", clock)
+    limiter = AdaptiveLimiter(initial_limit=8)
+    run_requests(limiter, clock, 100, 0.01)
+    # the network gets five times slower and stays that way
+    run_requests(limiter, clock, 100, 0.05)
+    low = limiter.limit
+    run_requests(limiter, clock, 400, 0.05)
+    assert limiter.baseline["request"] > 0.05 / limiter.latency_factor
+    assert limiter.limit > max(low, 8)
+
+
+def test_search_and_detail_latencies_kept_apart(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, "time", clock)
+    limiter = AdaptiveLimiter(initial_limit=4)
+    for _ in range(100):
+        run_requests(limiter, clock, 1, 1.0, "search")
+        run_requests(limiter, clock, 9, 0.01, "detail")
+    # large searches among small detail pages are not a slowdown: nothing holds the limit back
+    assert limiter.limit == limiter.max_limit
@@ -0,0 +1,139 @@
+#throttle.py
+# AIMD (additive increase, multiplicative decrease) concurrency limiter with a
+# circuit breaker. Every request to the site goes through one limiter: the
+# number of requests in flight grows by roughly one per round of healthy
+# responses and halves on 429/5xx/connection errors, and eases off when latency
+# climbs well above its baseline. Latency is tracked per kind of request
+# (a search returns far more data than a streamed detail page), and each
+# baseline follows the best recent median but drifts up towards the current
+# one, so a lasting shift such as a slower network becomes the new normal
+# instead of holding the limit down for good. A run of consecutive failures
+# opens the breaker, pausing all requests until it cools down; the first
+# request afterwards is a single probe that closes it again on success.
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# HTTP statuses that mean the site wants us to back off
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+# share of the gap to the current median latency a baseline closes per check
+BASELINE_DRIFT = 0.05
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial_limit: float = 4, min_limit: float = 1, max_limit: float = 32,
+                 latency_factor: float = 3.0, window: int = 50, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        # back off when the p90 latency exceeds latency_factor times the baseline p50
+        self.latency_factor = latency_factor
+        self.window = window
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.in_flight = 0
+        # request kind -> recent latencies, and -> baseline p50
+        self.latencies: Dict[str, deque] = {}
+        self.baseline: Dict[str, float] = {}
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.last_decrease = 0.0
+
+        # counters for reporting
+        self.sent = 0
+        self.successes = 0
+        self.failures = 0
+        self.breaker_trips = 0
+
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self.open_until:
+                    self._cond.wait(self.open_until - now)
+                    continue
+                if self.probing:
+                    # breaker half-open: only the probe request is allowed through
+                    self._cond.wait()
+                    continue
+                if self.open_until and self.in_flight == 0:
+                    # cooldown over; send a single probe before resuming
+                    self.open_until = 0.0
+                    self.probing = True
+                    self.in_flight += 1
+                    self.sent += 1
+                    return
+                if not self.open_until and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    self.sent += 1
+                    return
+                self._cond.wait(0.5)
+
+    def release(self, latency: float, status: Optional[int] = None, retry_after: Optional[float] = None, kind: str = "request"):
+        """Record the outcome of a request. status is None for connection errors."""
+        with self._cond:
+            self.in_flight -= 1
+            failed = status is None or status in BACKOFF_STATUSES
+            if failed:
+                self._on_failure(retry_after, kind)
+            else:
+                self._on_success(latency, kind)
+            self._cond.notify_all()
+
+    def _on_success(self, latency: float, kind: str):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.probing = False
+        latencies = self.latencies.setdefault(kind, deque(maxlen=self.window))
+        latencies.append(latency)
+        if len(latencies) >= 10:
+            p50 = percentile(latencies, 0.5)
+            baseline = self.baseline.get(kind)
+            if baseline is None or p50 < baseline:
+                self.baseline[kind] = p50
+            else:
+                self.baseline[kind] = baseline + BASELINE_DRIFT * (p50 - baseline)
+            if percentile(latencies, 0.9) > self.latency_factor * self.baseline[kind]:
+                # the site is slowing down under our load; judge the new limit on fresh samples
+                self._decrease(0.9, kind)
+                latencies.clear()
+                return
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_failure(self, retry_after: Optional[float], kind: str):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._decrease(0.5, kind)
+        if self.probing or self.consecutive_failures >= self.breaker_threshold or retry_after:
+            self.probing = False
+            self.breaker_trips += 1
+            pause = retry_after if retry_after else self.breaker_cooldown
+            self.open_until = time.monotonic() + pause
+            print(f"Site is pushing back; pausing requests for {pause:.0f}s")
+
+    def _decrease(self, factor: float, kind: str):
+        # decrease at most once per round trip so one burst of failures does not collapse the limit
+        now = time.monotonic()
+        round_trip = self.baseline.get(kind, 0.0)
+        if now - self.last_decrease < round_trip:
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def stats(self) -> str:
+        return (f"limit {self.limit:.1f}, {self.successes} ok, {self.failures} failed, "
+                f"{self.breaker_trips} pause(s)")